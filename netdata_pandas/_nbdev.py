@@ -5,14 +5,79 @@ __all__ = ["index", "modules", "custom_doc_links", "git_url"]
 index = {"get_chart_list": "00_data.ipynb",
          "get_chart": "00_data.ipynb",
          "get_charts": "00_data.ipynb",
+         "aget_data": "00_data.ipynb",
          "get_data": "00_data.ipynb",
          "get_alarm_log": "00_data.ipynb",
          "get_allmetrics": "00_data.ipynb",
+         "aget_allmetrics": "00_data.ipynb",
          "get_allmetrics_async": "00_data.ipynb",
          "drop_low_uniqueness_cols": "01_wrangle.ipynb",
-         "drop_low_std_cols": "01_wrangle.ipynb"}
+         "drop_low_std_cols": "01_wrangle.ipynb",
+         "ColumnStats": "01_wrangle.ipynb",
+         "MockNetdata": "02_mock.ipynb",
+         "bench_get_data": "03_benchmark.ipynb",
+         "bench_parse": "03_benchmark.ipynb",
+         "bench_get_allmetrics": "03_benchmark.ipynb",
+         "bench_get_alarm_log": "03_benchmark.ipynb",
+         "bench_import": "03_benchmark.ipynb",
+         "run_benchmarks": "03_benchmark.ipynb",
+         "main": "20_cli.ipynb",
+         "FetchError": "04_fetch.ipynb",
+         "HostHealth": "04_fetch.ipynb",
+         "Fetcher": "04_fetch.ipynb",
+         "RingBuffer": "05_buffer.ipynb",
+         "DataTail": "06_tail.ipynb",
+         "ChartCache": "07_cache.ipynb",
+         "get_charts_cached": "07_cache.ipynb",
+         "parse_chart": "08_parse.ipynb",
+         "chart_columns": "08_parse.ipynb",
+         "chart_frame": "08_parse.ipynb",
+         "parse_allmetrics": "08_parse.ipynb",
+         "GridBuffer": "09_assemble.ipynb",
+         "resolve_window": "10_plan.ipynb",
+         "plan_chunks": "10_plan.ipynb",
+         "data_options": "10_plan.ipynb",
+         "resample_points": "10_plan.ipynb",
+         "data_query": "10_plan.ipynb",
+         "ChartCatalog": "11_catalog.ipynb",
+         "default_catalog": "11_catalog.ipynb",
+         "AllMetricsSampler": "12_sampler.ipynb",
+         "get_charts_sharded": "13_shard.ipynb",
+         "Sink": "14_sink.ipynb",
+         "CallbackSink": "14_sink.ipynb",
+         "ParquetSink": "14_sink.ipynb",
+         "FeatherSink": "14_sink.ipynb",
+         "SinkReader": "14_sink.ipynb",
+         "Instrument": "15_stats.ipynb",
+         "no_instrument": "15_stats.ipynb",
+         "LazyFrame": "16_lazy.ipynb",
+         "AlarmLog": "17_alarms.ipynb",
+         "HostCube": "18_cube.ipynb",
+         "CubeAssembler": "18_cube.ipynb",
+         "CoalescingFetcher": "19_client.ipynb",
+         "NetdataClient": "19_client.ipynb",
+         "read_spec": "20_cli.ipynb"}
 
-modules = ["data.py",
+modules = ["alarms.py",
+           "assemble.py",
+           "benchmark.py",
+           "buffer.py",
+           "cache.py",
+           "catalog.py",
+           "cli.py",
+           "client.py",
+           "cube.py",
+           "data.py",
+           "fetch.py",
+           "lazy.py",
+           "mock.py",
+           "parse.py",
+           "plan.py",
+           "sampler.py",
+           "shard.py",
+           "sink.py",
+           "stats.py",
+           "tail.py",
            "wrangle.py"]
 
 doc_url = "https://netdata.github.io/netdata-pandas/"
@@ -0,0 +1,129 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: 17_alarms.ipynb (unless otherwise specified).
+
+__all__ = ['AlarmLog']
+
+# Cell
+# export
+import anyio
+import asks
+import pandas as pd
+import trio
+from .fetch import Fetcher, FetchError
+from .stats import Instrument, no_instrument
+
+# Cell
+
+
+_ALARM_DATETIME_COLS = ['when', 'delay_up_to_timestamp']
+
+
+class AlarmLog:
+    """An incrementally updated alarm log of `hosts`.
+
+    ##### Parameters:
+    - **hosts** `list` A list of hosts to get the alarm log of.
+    - **datetimes** `bool` True to convert the `when` and `delay_up_to_timestamp` columns to datetimes.
+    - **timeout** `int` Number of seconds to wait for each poll before moving on without the hosts that have not answered.
+    - **user** `str` A username to use if netdata is password protected.
+    - **pwd** `str` A password to use if netdata is password protected.
+    - **protocol** `str` 'http' or 'https'.
+    - **max_connections** `int` Max number of requests in flight across all hosts.
+    - **max_connections_per_host** `int` Max number of requests in flight (and size of connection pool) for each host.
+
+    """
+
+    def __init__(self, hosts: list = ['127.0.0.1:19999'], datetimes: bool = True, timeout: int = 60, user: str = None,
+                 pwd: str = None, protocol: str = 'http', max_connections: int = 100, max_connections_per_host: int = 8):
+        if isinstance(hosts, str):
+            hosts = [hosts]
+        self.hosts = hosts
+        self.datetimes = datetimes
+        self.timeout = timeout
+        self.user, self.pwd, self.protocol = user, pwd, protocol
+        self.max_connections, self.max_connections_per_host = max_connections, max_connections_per_host
+        self.last_ids = {}
+        self.missing = []
+        self._frames = []
+        self._df = pd.DataFrame()
+
+    async def _fetch(self, fetcher: Fetcher, host: str, results: dict, instrument: Instrument):
+        url = f'{self.protocol}://{host}/api/v1/alarm_log?after={self.last_ids.get(host, 0)}'
+        record = instrument.request(url, host)
+        try:
+            r = await fetcher.get(url, self.user, self.pwd, record=record)
+            r.raise_for_status()
+            with instrument.timing(record, 'parse'):
+                entries = r.json()
+        except (FetchError, asks.errors.BadStatus, ValueError) as e:
+            # leave the host out of this poll rather than fail every host
+            instrument.finish(record, e)
+            return
+        except BaseException as e:
+            instrument.finish(record, e)
+            raise
+        instrument.finish(record, rows=len(entries))
+        results[host] = entries
+
+    def _frame(self, results: dict) -> pd.DataFrame:
+        """Type the new entries of each host into one dataframe, oldest first."""
+        frames = []
+        for host in self.hosts:
+            if results.get(host):
+                df = pd.DataFrame(results[host])
+                df.insert(0, 'host', host)
+                frames.append(df.sort_values('unique_id'))
+        if not frames:
+            return self._frames[0].iloc[:0] if self._frames else self._df
+        df = pd.concat(frames, ignore_index=True, sort=False)
+        if self.datetimes:
+            for col in _ALARM_DATETIME_COLS:
+                if col in df.columns:
+                    df[col] = pd.to_datetime(df[col], unit='s')
+        return df
+
+    async def apoll(self, fetcher: Fetcher = None, instrument: Instrument = None) -> pd.DataFrame:
+        """Awaitable version of `poll`.
+
+        ##### Parameters:
+        - **fetcher** `Fetcher` A `Fetcher` to make requests with, if None one is created from the connection limits.
+        - **instrument** `Instrument` If set, a record of each request is added to `instrument`.
+
+        """
+        instrument = instrument or no_instrument
+        results = {}
+        async with (fetcher or Fetcher(self.max_connections, self.max_connections_per_host)) as fetcher:
+            async with anyio.move_on_after(self.timeout):
+                async with anyio.create_task_group() as tg:
+                    for host in self.hosts:
+                        await tg.spawn(self._fetch, fetcher, host, results, instrument)
+        self.missing = [host for host in self.hosts if host not in results]
+        df = self._frame(results)
+        if len(df):
+            for host, last_id in df.groupby('host')['unique_id'].max().items():
+                self.last_ids[host] = int(last_id)
+            # only concatenated when asked for, so a poll costs the new entries rather than the whole log
+            self._frames.append(df)
+            self._df = None
+        return df
+
+    def poll(self, instrument: Instrument = None) -> pd.DataFrame:
+        """Get the entries each host has added since the last poll (all of them on the first) and append them to the log.
+
+        ##### Parameters:
+        - **instrument** `Instrument` If set, a record of each request is added to `instrument`.
+
+        Any host that could not be polled is listed in `self.missing` until the next poll.
+
+        ##### Returns:
+        - **df** `pd.DataFrame` Just the new entries, with a `host` column of the host each came from.
+
+        """
+        return trio.run(self.apoll, None, instrument)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Every entry polled so far, oldest first for each poll."""
+        if self._df is None:
+            self._df = pd.concat(self._frames, ignore_index=True, sort=False)
+            self._frames = [self._df]
+        return self._df
+
@@ -0,0 +1,99 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: 09_assemble.ipynb (unless otherwise specified).
+
+__all__ = ['GridBuffer']
+
+# Cell
+# export
+import numpy as np
+import pandas as pd
+from .wrangle import ColumnStats
+
+# Cell
+
+
+class GridBuffer:
+    """Buffer the arrays of many charts, then assemble them into one dataframe with a row per (host, time).
+
+    ##### Parameters:
+    - **float_size** `str` float size to use if would like to save some memory, eg can use 'float32' or 'float16'.
+    - **host_prefix** `bool` True if columns are prefixed with their host, so rows are just indexed by time.
+    - **drop_host** `bool` True to index rows by time alone, eg when there is only one host.
+    - **nunique_thold** [`float`,`int`] If set, leave out columns `drop_low_uniqueness_cols` would drop.
+    - **std_thold** `float` If set, leave out columns `drop_low_std_cols` would drop.
+    - **diff** `bool` True to take the statistics for `nunique_thold` and `std_thold` over the differences of each column.
+
+    """
+
+    def __init__(self, float_size: str = 'float64', host_prefix: bool = False, drop_host: bool = False,
+                 nunique_thold=None, std_thold: float = None, diff: bool = False):
+        self.float_size = float_size
+        self.host_prefix = host_prefix
+        self.drop_host = drop_host
+        self.nunique_thold, self.std_thold, self.diff = nunique_thold, std_thold, diff
+        self.stats = ColumnStats() if nunique_thold or std_thold else None
+        self.blocks = []
+
+    def add(self, host: str, times, values, columns: list):
+        """Buffer a block of data until `to_frame`.
+
+        ##### Parameters:
+        - **host** `str` The host the data is from.
+        - **times** `array` The timestamp of each row.
+        - **values** `array` A 2d (rows, columns) array of values.
+        - **columns** `list` The column name of each column of `values`.
+
+        """
+        times, values, columns = np.asarray(times, dtype='int64'), np.asarray(values), list(columns)
+        if self.stats is not None:
+            stats_values = np.diff(values[np.argsort(times)], axis=0) if self.diff else values
+            self.stats.update(stats_values, columns)
+        self.blocks.append((host, times, values, columns))
+
+    def _columns(self) -> list:
+        """The union of the columns of all blocks, less any that fail the thresholds."""
+        columns = list(dict.fromkeys(col for _, _, _, cols in self.blocks for col in cols))
+        if self.stats is not None:
+            keep = set(self.stats.keep(self.nunique_thold, self.std_thold))
+            columns = [col for col in columns if col in keep]
+        return columns
+
+    def to_frame(self) -> pd.DataFrame:
+        """Write all blocks into one preallocated array and return it as a dataframe.
+
+        ##### Returns:
+        - **df** `pd.DataFrame` A dataframe with a row per sorted (host, time), or just time if `host_prefix` or `drop_host`.
+
+        """
+        by_time = self.host_prefix or self.drop_host
+        columns = self._columns()
+        if not by_time:
+            columns = sorted(columns)
+        col_idx = {col: i for i, col in enumerate(columns)}
+        # the union of times for each host, hosts one after the other in sorted order
+        hosts = [None] if by_time else sorted(set(host for host, _, _, _ in self.blocks))
+        host_times = {}
+        for host in hosts:
+            times = [times for h, times, _, _ in self.blocks if by_time or h == host]
+            host_times[host] = np.unique(np.concatenate(times)) if times else np.zeros(0, dtype='int64')
+        offsets = dict(zip(hosts, np.cumsum([0] + [len(host_times[host]) for host in hosts])))
+        out = np.full((sum(len(times) for times in host_times.values()), len(columns)), np.nan, dtype=self.float_size)
+        self.blocks.reverse()
+        while self.blocks:
+            host, times, values, cols = self.blocks.pop()
+            host = None if by_time else host
+            rows = offsets[host] + np.searchsorted(host_times[host], times)
+            keep = [i for i, col in enumerate(cols) if col in col_idx]
+            if len(keep) < len(cols):
+                values, cols = values[:, keep], [cols[i] for i in keep]
+            idx = np.ix_(rows, [col_idx[col] for col in cols])
+            out[idx] = np.fmax(out[idx], values)
+        times = np.concatenate([host_times[host] for host in hosts])
+        if by_time:
+            index = pd.Index(times, name='time_idx')
+        else:
+            index = pd.MultiIndex.from_arrays(
+                [np.repeat(np.array(hosts, dtype=object), [len(host_times[host]) for host in hosts]), times],
+                names=['host', 'time_idx']
+            )
+        return pd.DataFrame(out, index=index, columns=columns, copy=False)
+
@@ -0,0 +1,411 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: 03_benchmark.ipynb (unless otherwise specified).
+
+__all__ = ['bench_get_data', 'bench_parse', 'bench_get_allmetrics', 'bench_get_alarm_log', 'bench_import',
+           'run_benchmarks', 'main']
+
+# Cell
+# export
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+import requests
+import trio
+import netdata_pandas
+from . import __version__
+from .mock import MockNetdata
+from .fetch import Fetcher
+from .parse import parse_chart, chart_frame, chart_columns
+from .assemble import GridBuffer
+from .data import get_data, get_allmetrics, get_allmetrics_async, get_alarm_log
+from .wrangle import drop_low_uniqueness_cols, drop_low_std_cols
+
+# Cell
+
+
+def _time(func, repeat: int) -> tuple:
+    """Call `func` `repeat` times and return the list of timings along with the last result."""
+    timings, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return timings, result
+
+
+def _summarise(benchmark: str, stage: str, timings: list, params: dict) -> dict:
+    """Summarise the `timings` of a `stage` into a flat record."""
+    record = {'benchmark': benchmark, 'stage': stage, 'repeat': len(timings), 'min': min(timings),
+              'median': statistics.median(timings), 'mean': statistics.mean(timings), 'max': max(timings)}
+    record.update(params)
+    return record
+
+
+async def _fetch_all(urls: list) -> list:
+    """Fetch the raw content of each url in `urls` concurrently."""
+    bodies = [None] * len(urls)
+
+    async def fetch(fetcher, i, url):
+        r = await fetcher.get(url)
+        bodies[i] = r.content
+
+    async with Fetcher() as fetcher:
+        async with trio.open_nursery() as nursery:
+            for i, url in enumerate(urls):
+                nursery.start_soon(fetch, fetcher, i, url)
+    return bodies
+
+
+def _allmetrics_rows(raw_data: dict, col_sep: str = '|') -> list:
+    """The long [time, chart, dimension, value] rows `get_allmetrics` builds from an allmetrics response."""
+    rows = []
+    for k in raw_data:
+        dimensions = raw_data[k]['dimensions']
+        for dimension in dimensions:
+            rows.append([raw_data[k]['last_updated'], k, f"{k}{col_sep}{dimensions[dimension]['name']}", dimensions[dimension]['value']])
+    return rows
+
+
+
+# Cell
+
+
+def bench_get_data(hosts: list, charts: list, after: int = -600, before: int = 0, repeat: int = 3,
+                   params: dict = None) -> list:
+    """Benchmark `get_data` along with each stage of its pipeline.
+
+    ##### Parameters:
+    - **hosts** `list` A list of hosts to pull data from.
+    - **charts** `list` A list of charts to pull data for.
+    - **after** `int` The timestamp or relative integer from which to pull data after.
+    - **before** `int` The timestamp or relative integer from which to pull data before.
+    - **repeat** `int` Number of times to repeat each stage.
+    - **params** `dict` Extra fields to add to each record.
+
+    ##### Returns:
+    - **records** `list` A list of dicts, one per stage.
+
+    """
+    params = params or {}
+    calls = [
+        (f'http://{host}/api/v1/data?chart={chart}&after={after}&before={before}&points=0&format=json&group=average', host, chart)
+        for host in hosts for chart in charts
+    ]
+    stages = []
+    timings, bodies = _time(lambda: trio.run(_fetch_all, [call[0] for call in calls]), repeat)
+    stages.append(('fetch', timings))
+    timings, parsed = _time(lambda: [parse_chart(body) for body in bodies], repeat)
+    stages.append(('parse', timings))
+
+    def frame():
+        assembler = GridBuffer(drop_host=len(hosts) == 1)
+        for (url, host, chart), (times, values, labels) in zip(calls, parsed):
+            assembler.add(host, times, values, chart_columns(labels, chart, host))
+        return assembler
+
+    timings, _ = _time(frame, repeat)
+    stages.append(('frame', timings))
+    timings, df = _time(lambda: frame().to_frame(), repeat)
+    stages.append(('merge', timings))
+
+    def post():
+        out = df.ffill().diff().dropna(how='all')
+        out = drop_low_uniqueness_cols(out, 0.05)
+        out = drop_low_std_cols(out, 0.01)
+        return out.reindex(sorted(out.columns), axis=1)
+
+    timings, _ = _time(post, repeat)
+    stages.append(('post', timings))
+    timings, _ = _time(lambda: get_data(hosts, charts, after=after, before=before, diff=True, nunique_thold=0.05,
+                                        std_thold=0.01), repeat)
+    stages.append(('total', timings))
+    return [_summarise('get_data', stage, timings, params) for stage, timings in stages]
+
+
+
+# Cell
+
+
+def _legacy_frame(body: bytes, chart: str, host: str) -> pd.DataFrame:
+    """The dataframe `get_chart` builds without the `parse_chart` fast path."""
+    r_json = json.loads(body)
+    df = pd.DataFrame(r_json['data'], columns=['time_idx'] + r_json['labels'][1:])
+    df['host'] = host
+    df = df.set_index(['host', 'time_idx']).add_prefix(f'{chart}|')
+    return df._get_numeric_data().astype('float64')
+
+
+def _peak_bytes(func) -> int:
+    """Peak memory allocated while calling `func`."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_parse(hosts: list, charts: list, after: int = -600, before: int = 0, repeat: int = 3,
+                params: dict = None) -> list:
+    """Benchmark turning each `/api/v1/data` response into a dataframe, with and without the `parse_chart` fast path.
+
+    Timings are per chart and each record also has the mean peak bytes allocated per chart.
+
+    ##### Parameters:
+    - **hosts** `list` A list of hosts to pull data from.
+    - **charts** `list` A list of charts to pull data for.
+    - **after** `int` The timestamp or relative integer from which to pull data after.
+    - **before** `int` The timestamp or relative integer from which to pull data before.
+    - **repeat** `int` Number of times to repeat each stage.
+    - **params** `dict` Extra fields to add to each record.
+
+    ##### Returns:
+    - **records** `list` A list of dicts, one per stage.
+
+    """
+    params = params or {}
+    calls = [
+        (f'http://{host}/api/v1/data?chart={chart}&after={after}&before={before}&points=0&format=json&group=average', host, chart)
+        for host in hosts for chart in charts
+    ]
+    bodies = trio.run(_fetch_all, [call[0] for call in calls])
+    frames = {
+        'legacy': lambda body, host, chart: _legacy_frame(body, chart, host),
+        'fast': lambda body, host, chart: chart_frame(parse_chart(body), chart, host),
+    }
+    records = []
+    for stage, frame in frames.items():
+        timings, _ = _time(lambda: [frame(body, host, chart) for body, (_, host, chart) in zip(bodies, calls)], repeat)
+        peak_bytes = [_peak_bytes(lambda: frame(body, host, chart)) for body, (_, host, chart) in zip(bodies, calls)]
+        record = _summarise('parse', stage, [t / len(calls) for t in timings], params)
+        record['peak_bytes'] = statistics.mean(peak_bytes)
+        records.append(record)
+    return records
+
+
+
+# Cell
+
+
+def bench_get_allmetrics(hosts: list, repeat: int = 3, params: dict = None) -> list:
+    """Benchmark `get_allmetrics` and `get_allmetrics_async` along with each stage of their pipeline.
+
+    ##### Parameters:
+    - **hosts** `list` A list of hosts to pull data from.
+    - **repeat** `int` Number of times to repeat each stage.
+    - **params** `dict` Extra fields to add to each record.
+
+    ##### Returns:
+    - **records** `list` A list of dicts, one per stage.
+
+    """
+    params = params or {}
+    urls = [f'http://{host}/api/v1/allmetrics?format=json' for host in hosts]
+    stages = []
+    timings, bodies = _time(lambda: [requests.get(url).content for url in urls], repeat)
+    stages.append(('get_allmetrics', 'fetch', timings))
+    timings, bodies = _time(lambda: trio.run(_fetch_all, urls), repeat)
+    stages.append(('get_allmetrics_async', 'fetch', timings))
+    timings, parsed = _time(lambda: [json.loads(body) for body in bodies], repeat)
+    stages.append(('get_allmetrics', 'parse', timings))
+    timings, frames = _time(
+        lambda: [pd.DataFrame(_allmetrics_rows(raw_data), columns=['time', 'chart', 'dimension', 'value']) for raw_data in parsed],
+        repeat
+    )
+    stages.append(('get_allmetrics', 'frame', timings))
+
+    def merge():
+        wide = [
+            df[['dimension', 'value']].groupby('dimension').mean().reset_index().pivot_table(columns=['dimension'])
+            for df in frames
+        ]
+        df = pd.concat(wide, join='outer', axis=1 if len(hosts) == 1 else 0, sort=True)
+        return df.groupby(by=df.index).max()
+
+    timings, _ = _time(merge, repeat)
+    stages.append(('get_allmetrics', 'merge', timings))
+    host_charts_dict = {host: None for host in hosts}
+    timings, _ = _time(lambda: get_allmetrics(host_charts_dict=host_charts_dict, wide=True), repeat)
+    stages.append(('get_allmetrics', 'total', timings))
+    timings, _ = _time(lambda: get_allmetrics_async(host_charts_dict=host_charts_dict, wide=True), repeat)
+    stages.append(('get_allmetrics_async', 'total', timings))
+    return [_summarise(benchmark, stage, timings, params) for benchmark, stage, timings in stages]
+
+
+
+# Cell
+
+
+def bench_get_alarm_log(host: str, repeat: int = 3, params: dict = None) -> list:
+    """Benchmark `get_alarm_log` along with each stage of its pipeline.
+
+    ##### Parameters:
+    - **host** `str` The host to get the alarm log from.
+    - **repeat** `int` Number of times to repeat each stage.
+    - **params** `dict` Extra fields to add to each record.
+
+    ##### Returns:
+    - **records** `list` A list of dicts, one per stage.
+
+    """
+    params = params or {}
+    stages = []
+    timings, body = _time(lambda: requests.get(f'http://{host}/api/v1/alarm_log').content, repeat)
+    stages.append(('fetch', timings))
+    timings, alarm_log = _time(lambda: json.loads(body), repeat)
+    stages.append(('parse', timings))
+    timings, df = _time(lambda: pd.DataFrame(alarm_log), repeat)
+    stages.append(('frame', timings))
+
+    def post():
+        out = df.copy()
+        for col in ['when', 'delay_up_to_timestamp']:
+            out[col] = pd.to_datetime(out[col], unit='s')
+        return out
+
+    timings, _ = _time(post, repeat)
+    stages.append(('post', timings))
+    timings, _ = _time(lambda: get_alarm_log(host), repeat)
+    stages.append(('total', timings))
+    return [_summarise('get_alarm_log', stage, timings, params) for stage, timings in stages]
+
+
+
+# Cell
+
+
+_HEAVY_MODULES = ['numpy', 'pandas', 'trio', 'anyio', 'asks', 'requests', 'pyarrow']
+_IMPORT_CODE = '\n'.join([
+    'import json, sys, time',
+    'start = time.perf_counter()',
+    'import {module}',
+    'seconds = time.perf_counter() - start',
+    'print(json.dumps([seconds, [name for name in {heavy} if name in sys.modules]]))',
+])
+
+
+def _time_import(module: str, env: dict) -> tuple:
+    """The seconds taken to import `module` in a fresh interpreter, and the heavy dependencies it loaded."""
+    out = subprocess.run([sys.executable, '-c', _IMPORT_CODE.format(module=module, heavy=_HEAVY_MODULES)],
+                         stdout=subprocess.PIPE, env=env, check=True).stdout
+    return tuple(json.loads(out))
+
+
+def bench_import(modules: list = None, repeat: int = 3, params: dict = None, budget: float = 0.25) -> list:
+    """Benchmark the time to import each of `modules` in a fresh interpreter, as a short lived job would.
+
+    ##### Parameters:
+    - **modules** `list` The modules to import, the command line and data entry points if None.
+    - **repeat** `int` Number of times to repeat each import.
+    - **params** `dict` Extra fields to add to each record.
+    - **budget** `float` Max number of seconds each module may take to import on top of the heavy dependencies it loads, not checked if None.
+
+    ##### Returns:
+    - **records** `list` A list of dicts, one per module, with the heavy dependencies it imported in `loaded` and the
+    (median) seconds it took on top of importing them in `own`.
+
+    """
+    modules = modules or ['netdata_pandas.cli', 'netdata_pandas.fetch', 'netdata_pandas.data']
+    params = params or {}
+    # import this copy of the package, wherever the benchmark is run from
+    root = os.path.dirname(os.path.dirname(os.path.abspath(netdata_pandas.__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in [root, os.environ.get('PYTHONPATH')] if p))
+    records = []
+    for module in modules:
+        timings, baselines = [], []
+        for _ in range(repeat):
+            seconds, loaded = _time_import(module, env)
+            timings.append(seconds)
+            # the dependencies on their own, so the budget does not depend on how fast eg pandas imports here
+            baselines.append(_time_import(', '.join(loaded), env)[0] if loaded else 0.0)
+        record = _summarise('import', module, timings, params)
+        record['loaded'] = ','.join(loaded)
+        record['own'] = max(0.0, record['median'] - statistics.median(baselines))
+        if budget is not None and record['own'] > budget:
+            raise AssertionError(
+                f'Importing {module} took {record["own"]:.3f}s on top of its dependencies, over the {budget}s budget.'
+            )
+        records.append(record)
+    return records
+
+
+
+# Cell
+
+
+def run_benchmarks(n_hosts: int = 1, n_charts: int = 50, n_dims: int = 8, window: int = 600, latency: float = 0.0,
+                   n_alarms: int = 100, repeat: int = 3, benchmarks: list = None) -> pd.DataFrame:
+    """Run the benchmark suite against a `MockNetdata` started with the given parameters.
+
+    ##### Parameters:
+    - **n_hosts** `int` Number of mock hosts.
+    - **n_charts** `int` Number of charts on each mock host.
+    - **n_dims** `int` Number of dimensions on each chart.
+    - **window** `int` Number of seconds of data to pull.
+    - **latency** `float` Seconds of latency to inject into each response.
+    - **n_alarms** `int` Number of entries in the alarm log.
+    - **repeat** `int` Number of times to repeat each stage.
+    - **benchmarks** `list` Subset of ['get_data', 'parse', 'get_allmetrics', 'get_alarm_log', 'import'] to run, all if None.
+
+    ##### Returns:
+    - **df** `pd.DataFrame` A dataframe with a row per benchmark stage.
+
+    """
+    benchmarks = benchmarks or ['get_data', 'parse', 'get_allmetrics', 'get_alarm_log', 'import']
+    params = {'n_hosts': n_hosts, 'n_charts': n_charts, 'n_dims': n_dims, 'window': window, 'latency': latency}
+    records = []
+    with MockNetdata(n_hosts=n_hosts, n_charts=n_charts, n_dims=n_dims, window=window, latency=latency,
+                     n_alarms=n_alarms) as mock:
+        if 'get_data' in benchmarks:
+            records += bench_get_data(mock.hosts, mock.charts, after=-window, before=0, repeat=repeat, params=params)
+        if 'parse' in benchmarks:
+            records += bench_parse(mock.hosts, mock.charts, after=-window, before=0, repeat=repeat, params=params)
+        if 'get_allmetrics' in benchmarks:
+            records += bench_get_allmetrics(mock.hosts, repeat=repeat, params=params)
+        if 'get_alarm_log' in benchmarks:
+            records += bench_get_alarm_log(mock.hosts[0], repeat=repeat, params=params)
+    if 'import' in benchmarks:
+        # only recorded here, the budget is checked by the tests so a slow machine does not lose the other results
+        records += bench_import(repeat=repeat, params=params, budget=None)
+    return pd.DataFrame(records)
+
+
+
+# Cell
+
+
+def main(args: list = None):
+    """Command line entry point, run the benchmarks and write the results as json."""
+    parser = argparse.ArgumentParser(description='Run the netdata_pandas benchmark suite against a local mock netdata.')
+    parser.add_argument('--hosts', type=int, default=1, help='number of mock hosts')
+    parser.add_argument('--charts', type=int, default=50, help='number of charts per host')
+    parser.add_argument('--dims', type=int, default=8, help='number of dimensions per chart')
+    parser.add_argument('--window', type=int, default=600, help='seconds of data to pull')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds of latency to inject into each response')
+    parser.add_argument('--alarms', type=int, default=100, help='number of alarm log entries')
+    parser.add_argument('--repeat', type=int, default=3, help='number of times to repeat each stage')
+    parser.add_argument('--benchmarks', type=str, default=None, help='comma separated subset of benchmarks to run')
+    parser.add_argument('--output', type=str, default=None, help='file to write json results to, stdout if not set')
+    args = parser.parse_args(args)
+    df = run_benchmarks(n_hosts=args.hosts, n_charts=args.charts, n_dims=args.dims, window=args.window,
+                        latency=args.latency, n_alarms=args.alarms, repeat=args.repeat,
+                        benchmarks=args.benchmarks.split(',') if args.benchmarks else None)
+    results = {
+        'meta': {'timestamp': int(time.time()), 'netdata_pandas': __version__, 'python': platform.python_version(),
+                 'pandas': pd.__version__, 'numpy': np.__version__, 'platform': platform.platform()},
+        'results': df.to_dict(orient='records')
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+    return results
+
@@ -0,0 +1,100 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: 05_buffer.ipynb (unless otherwise specified).
+
+__all__ = ['RingBuffer']
+
+# Cell
+# export
+import numpy as np
+import pandas as pd
+
+# Cell
+
+
+class RingBuffer:
+    """A fixed size, preallocated ring buffer of rows indexed by time.
+
+    ##### Parameters:
+    - **capacity** `int` Max number of rows to keep.
+    - **columns** `list` Initial list of column names.
+    - **dtype** `str` The dtype of the values, eg 'float64' or 'float32'.
+    - **sort_cols** `bool` True to keep columns sorted by name as new ones are added.
+
+    """
+
+    def __init__(self, capacity: int, columns: list = None, dtype: str = 'float64', sort_cols: bool = True):
+        self.capacity = capacity
+        self.dtype = np.dtype(dtype)
+        self.sort_cols = sort_cols
+        self.columns = []
+        self._col_idx = {}
+        self._values = np.full((2 * capacity, 0), np.nan, dtype=self.dtype)
+        self._times = np.zeros(2 * capacity, dtype='int64')
+        self._head = 0
+        self._size = 0
+        if columns:
+            self.add_columns(columns)
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def last_time(self):
+        """The time of the latest row, None if empty."""
+        return int(self._times[self._head + self.capacity - 1]) if self._size else None
+
+    def add_columns(self, columns: list) -> np.ndarray:
+        """Add any of `columns` not already in the buffer and return the position of each of `columns`."""
+        new = [col for col in dict.fromkeys(columns) if col not in self._col_idx]
+        if new:
+            all_columns = self.columns + new
+            if self.sort_cols:
+                all_columns = sorted(all_columns)
+            col_idx = {col: i for i, col in enumerate(all_columns)}
+            values = np.full((2 * self.capacity, len(all_columns)), np.nan, dtype=self.dtype)
+            if self.columns:
+                values[:, [col_idx[col] for col in self.columns]] = self._values
+            self.columns, self._values, self._col_idx = all_columns, values, col_idx
+        return np.array([self._col_idx[col] for col in columns], dtype='int64')
+
+    def append(self, times, values, columns: list = None, idx: np.ndarray = None):
+        """Append rows to the buffer, dropping the oldest rows once full.
+
+        ##### Parameters:
+        - **times** `array` The time of each row, should be increasing.
+        - **values** `array` A 2d (rows, columns) array of values.
+        - **columns** `list` The column names `values` are for, all columns if None.
+        - **idx** `np.ndarray` Alternatively to `columns`, the buffer position of each column as returned from `add_columns`.
+
+        """
+        times = np.asarray(times, dtype='int64')
+        values = np.asarray(values, dtype=self.dtype).reshape(len(times), -1)
+        if len(times) > self.capacity:
+            times, values = times[-self.capacity:], values[-self.capacity:]
+        if idx is None and columns is not None:
+            idx = self.add_columns(columns)
+        pos = (self._head + np.arange(len(times))) % self.capacity
+        for p in (pos, pos + self.capacity):
+            self._times[p] = times
+            if idx is None:
+                self._values[p] = values
+            else:
+                self._values[p] = np.nan
+                self._values[p[:, None], idx[None, :]] = values
+        self._head = (self._head + len(times)) % self.capacity
+        self._size = min(self._size + len(times), self.capacity)
+
+    def view(self, n: int = None) -> tuple:
+        """Zero copy (times, values) views of the latest `n` rows (all if None), oldest first."""
+        n = self._size if n is None else min(n, self._size)
+        end = self._head + self.capacity
+        return self._times[end - n:end], self._values[end - n:end]
+
+    def to_frame(self, n: int = None, copy: bool = False) -> pd.DataFrame:
+        """The latest `n` rows as a dataframe indexed by `time_idx`.
+
+        Unless `copy` is True the dataframe is a view onto the buffer so will change as new rows are appended.
+        """
+        times, values = self.view(n)
+        df = pd.DataFrame(values, index=pd.Index(times, name='time_idx'), columns=self.columns, copy=copy)
+        return df
+
@@ -0,0 +1,341 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: 07_cache.ipynb (unless otherwise specified).
+
+__all__ = ['ChartCache', 'get_charts_cached']
+
+# Cell
+# export
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+import numpy as np
+import pandas as pd
+import anyio
+from .fetch import Fetcher, FetchError
+from .parse import parse_chart, chart_frame, chart_columns
+from .assemble import GridBuffer
+from .plan import resolve_window, plan_chunks
+
+# Cell
+
+
+def _missing_ranges(covered: list, after: int, before: int) -> list:
+    """The parts of `(after, before]` not covered by any of the `(after, before]` ranges in `covered`."""
+    missing, start = [], after
+    for cov_after, cov_before in sorted(covered):
+        if cov_before <= start:
+            continue
+        if cov_after >= before:
+            break
+        if cov_after > start:
+            missing.append((start, cov_after))
+        start = max(start, cov_before)
+    if start < before:
+        missing.append((start, before))
+    return missing
+
+
+
+# Cell
+
+
+class ChartCache:
+    """A size bounded, least recently used on disk cache of chart data.
+
+    ##### Parameters:
+    - **path** `str` Directory to keep the cache in.
+    - **max_bytes** `int` Max size of the cache on disk, least recently used segments are evicted beyond this.
+    - **max_segments** `int` Max number of segments to keep per chart before compacting them into one.
+
+    """
+
+    def __init__(self, path: str = '~/.cache/netdata_pandas', max_bytes: int = 2**30, max_segments: int = 16):
+        self.path = os.path.expanduser(path)
+        self.max_bytes = max_bytes
+        self.max_segments = max_segments
+        self._lock = threading.RLock()
+        self._pinned = {}
+        os.makedirs(self.path, exist_ok=True)
+        index_path = os.path.join(self.path, 'index.json')
+        self._index = {}
+        if os.path.exists(index_path):
+            with open(index_path) as f:
+                self._index = json.load(f)
+
+    @staticmethod
+    def _key(host: str, chart: str, points: int = 0, group: str = 'average') -> str:
+        return hashlib.sha1(json.dumps([host, chart, points, group]).encode('utf-8')).hexdigest()
+
+    def _save_index(self):
+        tmp = os.path.join(self.path, f'index.json.{uuid.uuid4().hex}')
+        with open(tmp, 'w') as f:
+            json.dump(self._index, f)
+        os.replace(tmp, os.path.join(self.path, 'index.json'))
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of all cached segments."""
+        return sum(seg['nbytes'] for entry in self._index.values() for seg in entry['segments'])
+
+    def missing(self, host: str, chart: str, after: int, before: int, points: int = 0, group: str = 'average') -> list:
+        """List of `(after, before)` ranges of `(after, before]` that are not in the cache."""
+        entry = self._index.get(self._key(host, chart, points, group))
+        covered = [(seg['after'], seg['before']) for seg in entry['segments']] if entry else []
+        return _missing_ranges(covered, after, before)
+
+    def _write_segment(self, key: str, times: np.ndarray, values: np.ndarray, labels: list, after: int, before: int) -> dict:
+        name = uuid.uuid4().hex
+        os.makedirs(os.path.join(self.path, key), exist_ok=True)
+        np.save(os.path.join(self.path, key, f'{name}.t.npy'), times)
+        np.save(os.path.join(self.path, key, f'{name}.v.npy'), values)
+        return {'name': name, 'after': int(after), 'before': int(before), 'labels': list(labels),
+                'nbytes': int(times.nbytes + values.nbytes), 'last_access': time.time()}
+
+    def _drop_segment(self, key: str, seg: dict):
+        for suffix in ['t', 'v']:
+            try:
+                os.remove(os.path.join(self.path, key, f"{seg['name']}.{suffix}.npy"))
+            except FileNotFoundError:
+                pass
+
+    def put(self, host: str, chart: str, times, values, labels: list, after: int, before: int, points: int = 0,
+            group: str = 'average'):
+        """Store the data fetched for `(after, before]` of a chart.
+
+        ##### Parameters:
+        - **host** `str` The host the data is from.
+        - **chart** `str` The chart the data is for.
+        - **times** `array` The timestamp of each row.
+        - **values** `array` A 2d (rows, dimensions) array of values.
+        - **labels** `list` The name of each dimension.
+        - **after** `int` The absolute timestamp the data was requested after.
+        - **before** `int` The absolute timestamp the data was requested before.
+        - **points** `int` The `points` the data was requested with.
+        - **group** `str` The `group` the data was requested with.
+
+        """
+        times = np.asarray(times, dtype='int64')
+        values = np.asarray(values, dtype='float64').reshape(len(times), len(labels))
+        keep = (times > after) & (times <= before)
+        times, values = times[keep], values[keep]
+        if len(times) == 0:
+            return
+        order = np.argsort(times)
+        times, values = times[order], values[order]
+        before = min(before, int(times[-1]))
+        key = self._key(host, chart, points, group)
+        with self._lock:
+            entry = self._index.setdefault(key, {'host': host, 'chart': chart, 'points': points, 'group': group, 'segments': []})
+            entry['segments'].append(self._write_segment(key, times, values, labels, after, before))
+            if len(entry['segments']) > self.max_segments:
+                self._compact(key)
+            self._evict()
+            self._save_index()
+
+    def _read(self, key: str, after: int, before: int, segments: list) -> tuple:
+        """Read `(after, before]` from `segments` into (times, values, labels)."""
+        labels = list(dict.fromkeys(label for seg in segments for label in seg['labels']))
+        label_idx = {label: i for i, label in enumerate(labels)}
+        all_times, all_values = [], []
+        for seg in segments:
+            times = np.load(os.path.join(self.path, key, f"{seg['name']}.t.npy"), mmap_mode='r')
+            start, end = np.searchsorted(times, after, side='right'), np.searchsorted(times, before, side='right')
+            if end <= start:
+                continue
+            values = np.load(os.path.join(self.path, key, f"{seg['name']}.v.npy"), mmap_mode='r')[start:end]
+            out = np.full((end - start, len(labels)), np.nan)
+            out[:, [label_idx[label] for label in seg['labels']]] = values
+            all_times.append(np.asarray(times[start:end]))
+            all_values.append(out)
+        if not all_times:
+            return np.zeros(0, dtype='int64'), np.zeros((0, len(labels))), labels
+        times, idx = np.unique(np.concatenate(all_times), return_index=True)
+        return times, np.concatenate(all_values)[idx], labels
+
+    def get(self, host: str, chart: str, after: int, before: int, points: int = 0, group: str = 'average') -> tuple:
+        """Read the cached data of a chart for `(after, before]`.
+
+        ##### Returns:
+        - **(times, values, labels)** `tuple` Sorted timestamps, a 2d (rows, dimensions) array of values and the name of each dimension.
+
+        """
+        key = self._key(host, chart, points, group)
+        with self._lock:
+            entry = self._index.get(key)
+            segments = [seg for seg in entry['segments'] if seg['after'] < before and seg['before'] > after] if entry else []
+            for seg in segments:
+                seg['last_access'] = time.time()
+            return self._read(key, after, before, segments)
+
+    def _compact(self, key: str):
+        """Merge all segments of `key` into as few as possible, one per contiguous covered range."""
+        entry = self._index[key]
+        segments = sorted(entry['segments'], key=lambda seg: seg['after'])
+        merged, groups = [], []
+        for seg in segments:
+            if groups and seg['after'] <= groups[-1][1]:
+                groups[-1][1] = max(groups[-1][1], seg['before'])
+                groups[-1][2].append(seg)
+            else:
+                groups.append([seg['after'], seg['before'], [seg]])
+        for after, before, group_segments in groups:
+            times, values, labels = self._read(key, after, before, group_segments)
+            merged.append(self._write_segment(key, times, values, labels, after, before))
+            for seg in group_segments:
+                self._drop_segment(key, seg)
+        entry['segments'] = merged
+
+    def pin(self, host_charts: list, points: int = 0, group: str = 'average'):
+        """Keep the segments of each (host, chart) in `host_charts` from being evicted until they are `unpin`ned."""
+        with self._lock:
+            for host, chart in host_charts:
+                key = self._key(host, chart, points, group)
+                self._pinned[key] = self._pinned.get(key, 0) + 1
+
+    def unpin(self, host_charts: list, points: int = 0, group: str = 'average'):
+        """Undo a `pin`, evicting anything the cache had to keep over `max_bytes` while pinned."""
+        with self._lock:
+            for host, chart in host_charts:
+                key = self._key(host, chart, points, group)
+                self._pinned[key] -= 1
+                if not self._pinned[key]:
+                    del self._pinned[key]
+            if self.nbytes > self.max_bytes:
+                self._evict()
+                self._save_index()
+
+    def _evict(self):
+        """Drop least recently used segments, other than pinned ones, until the cache fits in `max_bytes`."""
+        nbytes = self.nbytes
+        if nbytes <= self.max_bytes:
+            return
+        segments = sorted(
+            ((seg['last_access'], key, seg) for key, entry in self._index.items() for seg in entry['segments']
+             if key not in self._pinned),
+            key=lambda x: x[0]
+        )
+        for _, key, seg in segments:
+            if nbytes <= self.max_bytes:
+                break
+            self._index[key]['segments'].remove(seg)
+            self._drop_segment(key, seg)
+            nbytes -= seg['nbytes']
+        for key in [key for key, entry in self._index.items() if not entry['segments']]:
+            del self._index[key]
+
+    def invalidate(self, host: str = None, chart: str = None):
+        """Drop everything cached for `host` and/or `chart`, or everything if both are None."""
+        with self._lock:
+            for key in list(self._index):
+                entry = self._index[key]
+                if (host is None or entry['host'] == host) and (chart is None or entry['chart'] == chart):
+                    shutil.rmtree(os.path.join(self.path, key), ignore_errors=True)
+                    del self._index[key]
+            self._save_index()
+
+
+
+# Cell
+
+
+async def get_charts_cached(cache: ChartCache, host_charts: list, after: int, before: int, group: str = 'average',
+                            col_sep: str = '|', timeout: int = 60, float_size: str = 'float64', host_prefix: bool = False,
+                            host_sep: str = ':', user: str = None, pwd: str = None, protocol: str = 'http',
+                            max_connections: int = 100, max_connections_per_host: int = 8,
+                            assembler: GridBuffer = None, chunk_size=None, charts_info: dict = None,
+                            fetcher: Fetcher = None) -> pd.DataFrame:
+    """Get raw data for each (host, chart) in `host_charts` only fetching what is missing from `cache`.
+
+    ##### Parameters:
+    - **cache** `ChartCache` The cache to read from and store fetched data in.
+    - **host_charts** `list` A list of (host, chart) tuples to get data for.
+    - **after** `int` The timestamp or relative integer from which to pull data after.
+    - **before** `int` The timestamp or relative integer from which to pull data before.
+    - **group** `str` The grouping function to use in the netdata api call.
+    - **col_sep** `str` A character for separating chart and dimension in column names of dataframe.
+    - **timeout** `int` The number of seconds for trio to [move_on_after](https://trio.readthedocs.io/en/stable/reference-core.html#trio.move_on_after).
+    - **float_size** `str` float size to use if would like to save some memory, eg can use 'float32' or 'float16'.
+    - **host_prefix** `bool` True to prefix each colname with the corresponding host.
+    - **host_sep** `str` A character for separating host and chart and dimensions in column names of dataframe.
+    - **user** `str` A username to use if netdata is password protected.
+    - **pwd** `str` A password to use if netdata is password protected.
+    - **protocol** `str` 'http' or 'https'.
+    - **max_connections** `int` Max number of requests in flight across all hosts.
+    - **max_connections_per_host** `int` Max number of requests in flight (and size of connection pool) for each host.
+    - **assembler** `GridBuffer` If set, chart data is assembled into one time grid by `assembler` rather than concatenated.
+    - **chunk_size** [`int`,`str`] Seconds of data per request when fetching missing ranges, see `plan_chunks`.
+    - **charts_info** `dict` The `/api/v1/charts` metadata of each chart on each host, used to size chunks when `chunk_size` is 'auto'.
+    - **fetcher** `Fetcher` A `Fetcher` to make requests with, if None one is created from the connection limits.
+
+    Any (host, chart) that could not be (fully) fetched in time is listed in `df.attrs['missing']`, with whatever was
+    already cached for it still returned, an error is only raised if there is nothing to return at all.
+
+    ##### Returns:
+    - **df** `pd.DataFrame` A pandas dataframe in the same layout `get_charts` returns.
+
+    """
+    after, before = resolve_window(after, before)
+    charts_info = charts_info or {}
+    gaps, done, errors = [], set(), []
+
+    async def fetch(fetcher, host, chart, gap_after, gap_before):
+        url = f'{protocol}://{host}/api/v1/data?chart={chart}&after={gap_after}&before={gap_before}&points=0&format=json&group={group}'
+        try:
+            r = await fetcher.get(url, user, pwd)
+        except FetchError as e:
+            # leave the gap unfilled rather than fail every chart
+            errors.append(e)
+            return
+        parsed = parse_chart(r.content)
+        if parsed is not None:
+            times, values, labels = parsed
+            await anyio.run_sync_in_worker_thread(cache.put, host, chart, times, values, labels, gap_after, gap_before, 0, group)
+        done.add((host, chart, gap_after, gap_before))
+
+    # keep this pull's segments from being evicted by its own writes until they have been read back
+    cache.pin(host_charts, group=group)
+    try:
+        async with (fetcher or Fetcher(max_connections, max_connections_per_host)) as fetcher:
+            async with anyio.move_on_after(timeout):
+                async with anyio.create_task_group() as tg:
+                    for host, chart in host_charts:
+                        update_every = charts_info.get(host, {}).get(chart, {}).get('update_every', 1)
+                        for gap_after, gap_before in cache.missing(host, chart, after, before, group=group):
+                            for chunk_after, chunk_before in plan_chunks(gap_after, gap_before, chunk_size, update_every):
+                                gaps.append((host, chart, chunk_after, chunk_before))
+                                await tg.spawn(fetch, fetcher, host, chart, chunk_after, chunk_before)
+        missing = sorted(set((host, chart) for host, chart, *_ in gaps) - set((host, chart) for host, chart, *_ in done))
+
+        data, added = [], False
+        for host, chart in host_charts:
+            times, values, labels = cache.get(host, chart, after, before, group=group)
+            keep = ~np.isnan(values).all(axis=0)
+            if len(times) == 0 or not keep.any():
+                continue
+            labels = [label for label, k in zip(labels, keep) if k]
+            values = values[:, keep].astype(float_size)
+            if assembler is not None:
+                assembler.add(host, times, values, chart_columns(labels, chart, host, col_sep, host_prefix, host_sep))
+            else:
+                data.append(chart_frame((times, values, labels), chart, host, col_sep, host_prefix, host_sep))
+            added = True
+    finally:
+        cache.unpin(host_charts, group=group)
+    if errors and not added:
+        raise errors[0]
+    if assembler is not None:
+        df = assembler.to_frame()
+    else:
+        n_hosts = len(set(host for host, _ in host_charts))
+        if n_hosts == 1 or host_prefix:
+            df = pd.concat(data, join='outer', axis=1, sort=True)
+        else:
+            df = pd.concat(data, join='outer', axis=0, sort=True)
+    attrs = getattr(df, 'attrs', None)
+    if attrs is not None:
+        attrs['missing'] = missing
+    return df
+
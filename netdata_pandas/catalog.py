@@ -0,0 +1,133 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: 11_catalog.ipynb (unless otherwise specified).
+
+__all__ = ['ChartCatalog', 'default_catalog']
+
+# Cell
+# export
+import time
+import anyio
+import asks
+import trio
+from .fetch import Fetcher, FetchError
+
+# Cell
+
+
+class ChartCatalog:
+    """A per host cache of chart metadata, refreshed concurrently once older than `ttl`.
+
+    ##### Parameters:
+    - **ttl** `int` Number of seconds a host's chart metadata is used for before asking the host again.
+    - **timeout** `int` The number of seconds for trio to [move_on_after](https://trio.readthedocs.io/en/stable/reference-core.html#trio.move_on_after).
+    - **max_connections** `int` Max number of requests in flight across all hosts.
+    - **max_connections_per_host** `int` Max number of requests in flight (and size of connection pool) for each host.
+
+    """
+
+    def __init__(self, ttl: int = 300, timeout: int = 60, max_connections: int = 100, max_connections_per_host: int = 8):
+        self.ttl = ttl
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.missing = []
+        self._entries = {}
+
+    def _stale(self, host: str, now: float) -> bool:
+        entry = self._entries.get(host)
+        return entry is None or now - entry['fetched'] >= self.ttl
+
+    async def _fetch(self, fetcher: Fetcher, host: str, user: str = None, pwd: str = None, protocol: str = 'http'):
+        entry = self._entries.get(host)
+        headers = {}
+        if entry and entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        try:
+            r = await fetcher.get(f'{protocol}://{host}/api/v1/charts', user, pwd, headers=headers,
+                                  follow_redirects=False)
+            if r.status_code == 304 and entry:
+                entry['fetched'] = time.time()
+                return
+            r.raise_for_status()
+            charts = r.json().get('charts', {})
+        except (FetchError, asks.errors.BadStatus, ValueError):
+            # leave the host out (or its stale entry in place) rather than fail every host
+            return
+        self._entries[host] = {
+            'charts': charts, 'fetched': time.time(),
+            'etag': r.headers.get('etag'), 'last_modified': r.headers.get('last-modified')
+        }
+
+    async def refresh(self, hosts: list, user: str = None, pwd: str = None, protocol: str = 'http', force: bool = False,
+                      fetcher: Fetcher = None):
+        """Concurrently fetch the chart metadata of each of `hosts` that has none or is older than `ttl`.
+
+        ##### Parameters:
+        - **hosts** `list` A list of hosts to refresh.
+        - **user** `str` A username to use if netdata is password protected.
+        - **pwd** `str` A password to use if netdata is password protected.
+        - **protocol** `str` 'http' or 'https'.
+        - **force** `bool` True to refresh every host no matter how recently it was fetched.
+        - **fetcher** `Fetcher` A `Fetcher` to make requests with, if None one is created from the connection limits.
+
+        Any host that could not be refreshed is listed in `self.missing` until the next refresh.
+
+        """
+        now = time.time()
+        stale = [host for host in dict.fromkeys(hosts) if force or self._stale(host, now)]
+        self.missing = []
+        if not stale:
+            return
+        async with (fetcher or Fetcher(self.max_connections, self.max_connections_per_host)) as fetcher:
+            async with anyio.move_on_after(self.timeout):
+                async with anyio.create_task_group() as tg:
+                    for host in stale:
+                        await tg.spawn(self._fetch, fetcher, host, user, pwd, protocol)
+        self.missing = [host for host in stale if host not in self._entries or self._entries[host]['fetched'] < now]
+
+    async def acharts_info(self, hosts: list, user: str = None, pwd: str = None, protocol: str = 'http',
+                           fetcher: Fetcher = None) -> dict:
+        """Awaitable version of `charts_info`, refreshing through `fetcher` if given."""
+        if isinstance(hosts, str):
+            hosts = [hosts]
+        await self.refresh(hosts, user, pwd, protocol, fetcher=fetcher)
+        return {host: self._entries[host]['charts'] for host in hosts if host in self._entries}
+
+    def charts_info(self, hosts: list, user: str = None, pwd: str = None, protocol: str = 'http') -> dict:
+        """Get the chart metadata of each of `hosts`, refreshing any that are stale first.
+
+        ##### Parameters:
+        - **hosts** `list` A list of hosts to get chart metadata for.
+        - **user** `str` A username to use if netdata is password protected.
+        - **pwd** `str` A password to use if netdata is password protected.
+        - **protocol** `str` 'http' or 'https'.
+
+        ##### Returns:
+        - **charts_info** `dict` A dict of host to a dict of chart name to its metadata.
+
+        """
+        return trio.run(self.acharts_info, hosts, user, pwd, protocol)
+
+    def info(self, host: str, chart: str) -> dict:
+        """The cached metadata of `chart` on `host`, an empty dict if unknown."""
+        entry = self._entries.get(host)
+        return entry['charts'].get(chart, {}) if entry else {}
+
+    def dimensions(self, host: str, chart: str) -> list:
+        """The cached dimension names of `chart` on `host`."""
+        return [dim['name'] for dim in self.info(host, chart).get('dimensions', {}).values()]
+
+    def update_every(self, host: str, chart: str) -> int:
+        """The cached `update_every` of `chart` on `host`, None if unknown."""
+        return self.info(host, chart).get('update_every')
+
+    def invalidate(self, host: str = None):
+        """Drop the cached metadata of `host`, or of every host if None."""
+        if host is None:
+            self._entries = {}
+        else:
+            self._entries.pop(host, None)
+
+
+default_catalog = ChartCatalog()
\ No newline at end of file
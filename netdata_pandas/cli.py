@@ -0,0 +1,170 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: 20_cli.ipynb (unless otherwise specified).
+
+__all__ = ['read_spec', 'main']
+
+# Cell
+# export
+import argparse
+import json
+import os
+import sys
+
+# Cell
+
+
+def read_spec(path: str) -> dict:
+    """Read a json spec of the hosts and charts to export.
+
+    ##### Parameters:
+    - **path** `str` The spec file to read, '-' for stdin.
+
+    ##### Returns:
+    - **host_charts** `dict` A dict of each host and the list of charts to export from it, ['all'] for every chart.
+
+    """
+    if path == '-':
+        spec = json.load(sys.stdin)
+    else:
+        with open(os.path.expanduser(path)) as f:
+            spec = json.load(f)
+    if not isinstance(spec, dict):
+        raise ValueError(f'A spec must be a json object, got {type(spec).__name__}.')
+    if 'hosts' in spec:
+        hosts = [spec['hosts']] if isinstance(spec['hosts'], str) else spec['hosts']
+        spec = {host: spec.get('charts') for host in hosts}
+    return {host: [charts] if isinstance(charts, str) else list(charts or ['all']) for host, charts in spec.items()}
+
+
+def _format(output: str, fmt: str = None) -> str:
+    """The format to write `output` in, from its extension if `fmt` is not set."""
+    if fmt:
+        return fmt
+    name = output.lower()
+    if name == '-' or name.endswith('.csv') or '.csv.' in name:
+        return 'csv'
+    if name.endswith(('.parquet', '.pq')):
+        return 'parquet'
+    raise ValueError(f'Can not tell the format of {output}, set --format.')
+
+
+def _write(df, output: str, fmt: str):
+    """Write `df` to `output`, keeping the index unless it is just a row number."""
+    import pandas as pd
+    index = not isinstance(df.index, pd.RangeIndex)
+    if fmt == 'csv':
+        df.to_csv(sys.stdout if output == '-' else output, index=index)
+    else:
+        df.to_parquet(output, engine='pyarrow', index=index)
+
+
+
+# Cell
+
+
+async def _asnapshot(host_charts: dict, args):
+    import anyio
+    import pandas as pd
+    from .data import aget_allmetrics
+    from .fetch import Fetcher
+    frames, failed = {}, []
+
+    async def snapshot(fetcher, host, charts):
+        # one host at a time, as the rows of different hosts would be grouped together
+        try:
+            frames[host] = await aget_allmetrics(
+                {host: None if charts == ['all'] else charts}, timeout=args.timeout, user=args.user, pwd=args.pwd,
+                protocol=args.protocol, float_size=args.float_size, host_prefix=args.host_prefix, wide=args.wide,
+                fetcher=fetcher
+            )
+        except (OSError, ValueError):
+            # could not connect, or nothing came back within the timeout
+            failed.append(host)
+
+    async with Fetcher(args.max_connections) as fetcher:
+        async with anyio.create_task_group() as tg:
+            for host, charts in host_charts.items():
+                await tg.spawn(snapshot, fetcher, host, charts)
+    hosts = [host for host in host_charts if host in frames]
+    if not hosts:
+        raise OSError(f'Could not get a snapshot from any of {list(host_charts)}.')
+    if args.wide:
+        df = pd.concat([frames[host] for host in hosts], sort=False)
+        df.index = pd.Index(hosts, name='host')
+    else:
+        df = pd.concat([frames[host] for host in hosts], ignore_index=True, sort=False)
+    df.attrs['missing'] = sorted((host, chart) for host in failed for chart in host_charts[host])
+    return df
+
+
+async def _arange(host_charts: dict, args, sink=None):
+    from .catalog import default_catalog
+    from .data import aget_data
+    everything = [host for host, charts in host_charts.items() if charts == ['all']]
+    if everything:
+        charts_info = await default_catalog.acharts_info(everything, args.user, args.pwd, args.protocol)
+        for host in everything:
+            host_charts[host] = sorted(charts_info.get(host, {}))
+    return await aget_data(
+        after=args.after, before=args.before, points=args.points, group=args.group, ffill=args.ffill,
+        timeout=args.timeout, user=args.user, pwd=args.pwd, protocol=args.protocol, float_size=args.float_size,
+        host_charts_dict=host_charts, host_prefix=args.host_prefix, max_connections=args.max_connections,
+        sink=sink, request_timeout=args.request_timeout, retries=args.retries
+    )
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='netdata-pandas', description='Export data from netdata agents to a file.')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+    snapshot = commands.add_parser('snapshot', help='the latest value of every dimension, from /api/v1/allmetrics')
+    snapshot.add_argument('--wide', action='store_true', help='one row per host rather than one per dimension')
+    range_ = commands.add_parser('range', help='a window of data, as get_data returns it')
+    range_.add_argument('--after', type=int, default=-60, help='timestamp, or seconds before now, to export from')
+    range_.add_argument('--before', type=int, default=0, help='timestamp, or seconds before now, to export to')
+    range_.add_argument('--points', type=int, default=0, help='number of points per chart, 0 for every point')
+    range_.add_argument('--group', type=str, default='average', help='how the agents group points')
+    range_.add_argument('--no-ffill', dest='ffill', action='store_false', help='leave gaps unfilled')
+    range_.add_argument('--request-timeout', type=float, default=None, help='seconds to give each request')
+    range_.add_argument('--retries', type=int, default=0, help='number of times to retry a failed request')
+    for command in [snapshot, range_]:
+        command.add_argument('spec', help='json file of the hosts and charts to export, - for stdin')
+        command.add_argument('-o', '--output', type=str, default='-', help='file (or directory) to write to, stdout if not set')
+        command.add_argument('--format', type=str, default=None, choices=['csv', 'parquet', 'dataset'],
+                             help='output format, from the output file extension if not set')
+        command.add_argument('--timeout', type=int, default=60, help='seconds to wait for all the hosts')
+        command.add_argument('--user', type=str, default=None, help='username if netdata is password protected')
+        command.add_argument('--pwd', type=str, default=None, help='password if netdata is password protected')
+        command.add_argument('--protocol', type=str, default='http', choices=['http', 'https'])
+        command.add_argument('--float-size', type=str, default='float64', help='eg float32 to halve the size')
+        command.add_argument('--host-prefix', action='store_true', help='prefix each column with its host')
+        command.add_argument('--max-connections', type=int, default=100, help='max requests in flight')
+    return parser
+
+
+def main(args: list = None):
+    """Command line entry point, export the data of a spec file to a file."""
+    parser = _parser()
+    args = parser.parse_args(args)
+    try:
+        fmt = _format(args.output, args.format)
+        host_charts = read_spec(args.spec)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if fmt == 'dataset' and (args.command != 'range' or args.output == '-'):
+        parser.error('--format dataset is only for range, to an output directory.')
+    import trio
+    if args.command == 'snapshot':
+        df = trio.run(_asnapshot, host_charts, args)
+    elif fmt == 'dataset':
+        from .sink import ParquetSink
+        df = trio.run(_arange, host_charts, args, ParquetSink(args.output))
+    else:
+        df = trio.run(_arange, host_charts, args)
+    missing = getattr(df, 'attrs', {}).get('missing')
+    if missing:
+        print(f'netdata-pandas: {len(missing)} chart(s) could not be fetched:', file=sys.stderr)
+        for host, chart in missing:
+            print(f'  {host} {chart}', file=sys.stderr)
+    if fmt != 'dataset':
+        _write(df, args.output, fmt)
+
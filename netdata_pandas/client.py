@@ -0,0 +1,209 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: 19_client.ipynb (unless otherwise specified).
+
+__all__ = ['CoalescingFetcher', 'NetdataClient']
+
+# Cell
+# export
+from collections import OrderedDict
+from functools import partial
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import anyio
+import trio
+from .fetch import Fetcher
+
+# Cell
+
+
+def _normalize(url: str) -> str:
+    """`url` with its query parameters sorted, so equivalent urls give the same key."""
+    scheme, netloc, path, query, _ = urlsplit(url)
+    return urlunsplit((scheme, netloc, path, urlencode(sorted(parse_qsl(query, keep_blank_values=True))), ''))
+
+
+class CoalescingFetcher(Fetcher):
+    """A `Fetcher` that shares identical concurrent requests and memoizes recent responses.
+
+    ##### Parameters:
+    - **max_connections** `int` Max number of requests in flight across all hosts.
+    - **max_connections_per_host** `int` Max number of requests in flight (and size of connection pool) for each host.
+    - **ttl** `float` Number of seconds a response is reused for, 0 to only share requests that are in flight.
+    - **maxsize** `int` Max number of responses to keep.
+    - **hosts** `dict` Per host settings, eg `{'host:19999': {'user': 'me', 'pwd': 'secret', 'protocol': 'https'}}`.
+
+    """
+
+    def __init__(self, max_connections: int = 100, max_connections_per_host: int = 8, ttl: float = 1.0,
+                 maxsize: int = 1024, hosts: dict = None):
+        super().__init__(max_connections, max_connections_per_host)
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hosts = hosts or {}
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+        self._memo = OrderedDict()
+        self._in_flight = {}
+
+    def _configure(self, url: str, user: str = None, pwd: str = None) -> tuple:
+        """Apply any settings held for the host of `url`."""
+        scheme, netloc, path, query, fragment = urlsplit(url)
+        settings = self.hosts.get(netloc, {})
+        scheme = settings.get('protocol', scheme)
+        return urlunsplit((scheme, netloc, path, query, fragment)), settings.get('user', user), settings.get('pwd', pwd)
+
+    def _remember(self, key: tuple, r):
+        self._memo[key] = (time.monotonic() + self.ttl, r)
+        self._memo.move_to_end(key)
+        while len(self._memo) > self.maxsize:
+            self._memo.popitem(last=False)
+
+    def _recall(self, key: tuple):
+        entry = self._memo.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._memo[key]
+            return None
+        self._memo.move_to_end(key)
+        return entry[1]
+
+    async def get(self, url: str, user: str = None, pwd: str = None, headers: dict = None, follow_redirects: bool = True,
+                  record: dict = None):
+        url, user, pwd = self._configure(url, user, pwd)
+        if headers or not follow_redirects:
+            return await super().get(url, user, pwd, headers, follow_redirects, record)
+        key = (_normalize(url), user, pwd)
+        start = time.perf_counter()
+        while True:
+            r = self._recall(key) if self.ttl else None
+            if r is not None:
+                self.hits += 1
+                break
+            if key not in self._in_flight:
+                break
+            # wait for the identical request already in flight
+            event, outcome = self._in_flight[key]
+            await event.wait()
+            if 'response' in outcome:
+                self.coalesced += 1
+                r = outcome['response']
+                break
+            if 'error' in outcome:
+                raise outcome['error']
+            # the request was cancelled, so try again
+        if r is not None:
+            if record is not None:
+                record.update(wait=time.perf_counter() - start, transfer=0.0, status_code=r.status_code,
+                              bytes=len(r.content))
+            return r
+        self.misses += 1
+        event, outcome = anyio.create_event(), {}
+        self._in_flight[key] = (event, outcome)
+        try:
+            r = await super().get(url, user, pwd, record=record)
+            outcome['response'] = r
+            if self.ttl and r.status_code == 200:
+                self._remember(key, r)
+            return r
+        except Exception as e:
+            outcome['error'] = e
+            raise
+        finally:
+            del self._in_flight[key]
+            await event.set()
+
+    def clear(self):
+        """Forget all memoized responses."""
+        self._memo.clear()
+
+
+
+# Cell
+
+
+class NetdataClient:
+    """A long lived client running the `netdata_pandas.data` functions on one shared `CoalescingFetcher`.
+
+    Safe to call from many threads at once. Use as a context manager, or call `close()` when done.
+
+    ##### Parameters:
+    - **user** `str` A username to use for hosts with none of their own in `hosts`.
+    - **pwd** `str` A password to use for hosts with none of their own in `hosts`.
+    - **protocol** `str` 'http' or 'https', for hosts with none of their own in `hosts`.
+    - **hosts** `dict` Per host settings, eg `{'host:19999': {'user': 'me', 'pwd': 'secret', 'protocol': 'https'}}`.
+    - **ttl** `float` Number of seconds a response is reused for, 0 to only share requests that are in flight.
+    - **maxsize** `int` Max number of responses to keep.
+    - **max_connections** `int` Max number of requests in flight across all hosts.
+    - **max_connections_per_host** `int` Max number of requests in flight (and size of connection pool) for each host.
+
+    """
+
+    def __init__(self, user: str = None, pwd: str = None, protocol: str = 'http', hosts: dict = None, ttl: float = 1.0,
+                 maxsize: int = 1024, max_connections: int = 100, max_connections_per_host: int = 8):
+        self.user, self.pwd, self.protocol = user, pwd, protocol
+        self.fetcher = CoalescingFetcher(max_connections, max_connections_per_host, ttl, maxsize, hosts)
+        self._thread = None
+        self._token = None
+        self._stop = None
+        self._lock = threading.Lock()
+
+    async def _main(self, started: threading.Event):
+        self._token = trio.lowlevel.current_trio_token()
+        self._stop = trio.Event()
+        async with self.fetcher:
+            started.set()
+            await self._stop.wait()
+
+    def start(self) -> 'NetdataClient':
+        """Start the background event loop, done on first use if not called."""
+        with self._lock:
+            if self._thread is None:
+                started = threading.Event()
+                self._thread = threading.Thread(target=trio.run, args=(self._main, started), name='NetdataClient',
+                                                daemon=True)
+                self._thread.start()
+                started.wait()
+        return self
+
+    def close(self):
+        """Close the pooled connections and stop the background event loop."""
+        with self._lock:
+            if self._thread is not None:
+                trio.from_thread.run_sync(self._stop.set, trio_token=self._token)
+                self._thread.join()
+                self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def run(self, async_fn, *args, **kwargs):
+        """Run `async_fn(*args, fetcher=..., **kwargs)` on the client's event loop and return its result."""
+        self.start()
+        kwargs['fetcher'] = self.fetcher
+        return trio.from_thread.run(partial(async_fn, *args, **kwargs), trio_token=self._token)
+
+    def _defaults(self, kwargs: dict) -> dict:
+        for name in ['user', 'pwd', 'protocol']:
+            kwargs.setdefault(name, getattr(self, name))
+        return kwargs
+
+    def get_data(self, *args, **kwargs):
+        """`get_data` through the client, takes the same parameters."""
+        from .data import aget_data
+        return self.run(aget_data, *args, **self._defaults(kwargs))
+
+    def get_allmetrics(self, *args, **kwargs):
+        """`get_allmetrics_async` through the client, takes the same parameters."""
+        from .data import aget_allmetrics
+        return self.run(aget_allmetrics, *args, **self._defaults(kwargs))
+
+    def get_charts_info(self, hosts: list) -> dict:
+        """The `/api/v1/charts` metadata of each of `hosts`, through the client."""
+        from .catalog import ChartCatalog
+        return self.run(ChartCatalog(ttl=0).acharts_info, hosts, self.user, self.pwd, self.protocol)
+
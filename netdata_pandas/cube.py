@@ -0,0 +1,216 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: 18_cube.ipynb (unless otherwise specified).
+
+__all__ = ['HostCube', 'CubeAssembler']
+
+# Cell
+# export
+import warnings
+import numpy as np
+import pandas as pd
+from .assemble import GridBuffer
+from .wrangle import drop_low_uniqueness_cols, drop_low_std_cols
+
+# Cell
+
+
+_AGG_FUNCS = {
+    'mean': np.nanmean, 'min': np.nanmin, 'max': np.nanmax, 'sum': np.nansum, 'median': np.nanmedian,
+    'std': lambda values, axis: np.nanstd(values, axis=axis, ddof=1)
+}
+_DIMS = ['host', 'time_idx', 'column']
+
+
+class HostCube:
+    """Values of the same columns from many hosts, as one (hosts, times, columns) array.
+
+    ##### Parameters:
+    - **values** `np.ndarray` A 3d (hosts, times, columns) array.
+    - **hosts** `list` The host of each entry of the first dimension.
+    - **times** `list` The time of each entry of the second dimension, shared by every host.
+    - **columns** `list` The column name of each entry of the third dimension, shared by every host.
+
+    """
+
+    def __init__(self, values: np.ndarray, hosts: list, times: list, columns: list):
+        self.values = values
+        self.hosts = pd.CategoricalIndex(hosts, name='host')
+        self.times = times if isinstance(times, pd.DatetimeIndex) else pd.Index(times, name='time_idx')
+        self.columns = pd.Index(columns)
+        # metadata about the result, as in `pd.DataFrame.attrs`
+        self.attrs = {}
+
+    @property
+    def shape(self) -> tuple:
+        return self.values.shape
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes
+
+    def __repr__(self):
+        return f'<HostCube of {len(self.hosts)} hosts x {len(self.times)} times x {len(self.columns)} columns>'
+
+    def host(self, host: str) -> pd.DataFrame:
+        """A dataframe view of the values of `host`, sharing memory with the cube."""
+        return pd.DataFrame(self.values[self.hosts.get_loc(host)], index=self.times, columns=self.columns, copy=False)
+
+    def __getitem__(self, host: str) -> pd.DataFrame:
+        return self.host(host)
+
+    def __iter__(self):
+        """Iterate over (host, dataframe view) pairs."""
+        for i, host in enumerate(self.hosts):
+            yield host, pd.DataFrame(self.values[i], index=self.times, columns=self.columns, copy=False)
+
+    @staticmethod
+    def _indexer(index: pd.Index, key):
+        if key is None:
+            return slice(None)
+        if isinstance(key, slice):
+            return index.slice_indexer(key.start, key.stop, key.step)
+        keys = list(key) if isinstance(key, (list, tuple, np.ndarray, pd.Index)) else [key]
+        idx = index.get_indexer(keys)
+        if (idx < 0).any():
+            raise KeyError(f'{[k for k, i in zip(keys, idx) if i < 0]} not found.')
+        return idx
+
+    def isel(self, hosts=None, times=None, columns=None) -> 'HostCube':
+        """Select by position along each dimension, with an int, a list of ints or a slice (which keeps a view)."""
+        values = self.values
+        labels = [self.hosts, self.times, self.columns]
+        for axis, key in enumerate([hosts, times, columns]):
+            if key is None:
+                continue
+            key = [key] if isinstance(key, (int, np.integer)) else key
+            values = values[(slice(None),) * axis + (key,)]
+            labels[axis] = labels[axis][key]
+        return HostCube(values, labels[0].astype(object), labels[1], labels[2])
+
+    def sel(self, hosts=None, times=None, columns=None) -> 'HostCube':
+        """Select by label along each dimension, with a label, a list of labels or a slice of labels (inclusive, as `.loc`)."""
+        return self.isel(self._indexer(pd.Index(self.hosts.astype(object)), hosts), self._indexer(self.times, times),
+                         self._indexer(self.columns, columns))
+
+    def agg(self, func='mean', dim: str = 'host') -> pd.DataFrame:
+        """Reduce over `dim`, ignoring NaNs.
+
+        ##### Parameters:
+        - **func** [`str`,`callable`] One of 'mean', 'min', 'max', 'sum', 'median' or 'std', or a numpy style function taking `axis`.
+        - **dim** `str` 'host' for a (times, columns) dataframe over all hosts, 'time_idx' for a (hosts, columns) one over all times.
+
+        ##### Returns:
+        - **df** `pd.DataFrame` The reduced values.
+
+        """
+        func = _AGG_FUNCS[func] if isinstance(func, str) else func
+        axis = _DIMS.index(dim)
+        with warnings.catch_warnings():
+            # a host (or time) with no values at all just gives NaN
+            warnings.simplefilter('ignore', RuntimeWarning)
+            values = func(self.values, axis=axis)
+        index = self.times if axis == 0 else pd.Index(self.hosts.astype(object), name='host')
+        return pd.DataFrame(values, index=index, columns=self.columns)
+
+    def ffill(self) -> 'HostCube':
+        """Forward fill missing values of each host along time."""
+        missing = np.isnan(self.values)
+        if not missing.any():
+            return self
+        idx = np.where(missing, 0, np.arange(self.values.shape[1])[None, :, None])
+        np.maximum.accumulate(idx, axis=1, out=idx)
+        return HostCube(np.take_along_axis(self.values, idx, axis=1), self.hosts, self.times, self.columns)
+
+    def diff(self) -> 'HostCube':
+        """The difference of each host's values from its previous time, dropping times with no differences at all."""
+        values = np.full_like(self.values, np.nan)
+        values[:, 1:] = self.values[:, 1:] - self.values[:, :-1]
+        keep = ~np.isnan(values).all(axis=(0, 2))
+        return HostCube(values[:, keep], self.hosts, self.times[keep], self.columns)
+
+    def drop_low_cols(self, nunique_thold=None, std_thold: float = None) -> 'HostCube':
+        """Drop the columns `drop_low_uniqueness_cols` and `drop_low_std_cols` would drop from `to_frame`."""
+        values = self.values.reshape(-1, len(self.columns))
+        # leave out the rows `to_frame` drops, else the padding of hosts with uneven times counts towards uniqueness
+        values = values[~np.isnan(values).all(axis=1)]
+        df = pd.DataFrame(values, columns=self.columns, copy=False)
+        if nunique_thold:
+            df = drop_low_uniqueness_cols(df, nunique_thold)
+        if std_thold:
+            df = drop_low_std_cols(df, std_thold)
+        if len(df.columns) == len(self.columns):
+            return self
+        return self.isel(columns=self.columns.get_indexer(df.columns))
+
+    def to_frame(self, dropna: bool = True) -> pd.DataFrame:
+        """The cube as a dataframe with a row per (host, time), as `get_data` returns without `cube`.
+
+        ##### Parameters:
+        - **dropna** `bool` True to leave out the rows of hosts that have no values at all at that time.
+
+        """
+        n_hosts, n_times, n_cols = self.values.shape
+        index = pd.MultiIndex.from_arrays(
+            [np.repeat(np.array(self.hosts, dtype=object), n_times), np.tile(self.times, n_hosts)],
+            names=['host', self.times.name]
+        )
+        df = pd.DataFrame(self.values.reshape(-1, n_cols), index=index, columns=self.columns)
+        if dropna:
+            df = df[~np.isnan(self.values).all(axis=2).ravel()]
+        return df
+
+    def to_arrow(self):
+        """The cube as a pyarrow table with a row per (host, time), the host a dictionary encoded column."""
+        import pyarrow as pa
+        n_hosts, n_times, n_cols = self.values.shape
+        values = self.values.reshape(-1, n_cols)
+        arrays = [
+            pa.DictionaryArray.from_arrays(
+                pa.array(np.repeat(np.arange(n_hosts, dtype='int32'), n_times)), pa.array(list(self.hosts.astype(str)))
+            ),
+            pa.array(np.tile(np.asarray(self.times), n_hosts))
+        ] + [pa.array(values[:, j]) for j in range(n_cols)]
+        return pa.Table.from_arrays(arrays, names=['host', str(self.times.name)] + [str(col) for col in self.columns])
+
+
+
+# Cell
+
+
+class CubeAssembler(GridBuffer):
+    """A `GridBuffer` writing the blocks into a `HostCube`, returned from `to_frame` in place of a dataframe.
+
+    ##### Parameters:
+    - **float_size** `str` float size to use if would like to save some memory, eg can use 'float32' or 'float16'.
+    - **nunique_thold** [`float`,`int`] If set, leave out columns `drop_low_uniqueness_cols` would drop.
+    - **std_thold** `float` If set, leave out columns `drop_low_std_cols` would drop.
+    - **diff** `bool` True to take the statistics for `nunique_thold` and `std_thold` over the differences of each column.
+
+    """
+
+    def __init__(self, float_size: str = 'float64', nunique_thold=None, std_thold: float = None, diff: bool = False):
+        super().__init__(float_size, nunique_thold=nunique_thold, std_thold=std_thold, diff=diff)
+
+    def to_frame(self) -> HostCube:
+        """Write all blocks into one preallocated (hosts, times, columns) array.
+
+        ##### Returns:
+        - **cube** `HostCube` The cube of sorted hosts, times and columns.
+
+        """
+        columns = sorted(self._columns())
+        col_idx = {col: i for i, col in enumerate(columns)}
+        hosts = sorted(set(host for host, _, _, _ in self.blocks))
+        host_idx = {host: i for i, host in enumerate(hosts)}
+        times = np.unique(np.concatenate([times for _, times, _, _ in self.blocks])) if self.blocks else np.zeros(0, dtype='int64')
+        out = np.full((len(hosts), len(times), len(columns)), np.nan, dtype=self.float_size)
+        self.blocks.reverse()
+        while self.blocks:
+            host, block_times, values, cols = self.blocks.pop()
+            keep = [i for i, col in enumerate(cols) if col in col_idx]
+            if len(keep) < len(cols):
+                values, cols = values[:, keep], [cols[i] for i in keep]
+            grid = out[host_idx[host]]
+            idx = np.ix_(np.searchsorted(times, block_times), [col_idx[col] for col in cols])
+            grid[idx] = np.fmax(grid[idx], values)
+        return HostCube(out, hosts, times, columns)
+
@@ -1,22 +1,34 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: 00_data.ipynb (unless otherwise specified).
 
-__all__ = ['get_chart_list', 'get_chart', 'get_charts', 'get_data', 'get_alarm_log', 'get_allmetrics',
-           'get_allmetrics_async']
+__all__ = ['get_chart_list', 'get_chart', 'get_charts', 'aget_data', 'get_data', 'get_alarm_log', 'get_allmetrics',
+           'aget_allmetrics', 'get_allmetrics_async']
 
 # Cell
 # export
 import time
-import asks
-from asks import BasicAuth
+import anyio
 import trio
 import pandas as pd
-import requests
-from requests.auth import HTTPBasicAuth
 from .wrangle import drop_low_uniqueness_cols, drop_low_std_cols
+from .fetch import Fetcher, FetchError
+from .parse import parse_chart, chart_frame, chart_columns
+from .assemble import GridBuffer
+from .plan import plan_chunks, data_options, data_query, resample_points
+from .stats import Instrument, no_instrument
 
 # Cell
 
 
+def _sync_get(url: str, user: str = None, pwd: str = None):
+    """A blocking GET of `url` for the sync functions."""
+    # imported here as only the sync functions use requests and it is slow to import
+    import requests
+    if user and pwd:
+        from requests.auth import HTTPBasicAuth
+        return requests.get(url, auth=HTTPBasicAuth(user, pwd))
+    return requests.get(url)
+
+
 def get_chart_list(host: str = '127.0.0.1:19999', starts_with: str = None) -> list:
     """Get list of all available charts on a `host`.
 
@@ -29,7 +41,7 @@ def get_chart_list(host: str = '127.0.0.1:19999', starts_with: str = None) -> li
 
     """
     url = f"http://{host}/api/v1/charts"
-    r = requests.get(url)
+    r = _sync_get(url)
     charts = r.json().get('charts')
     chart_list = [chart for chart in charts]
     if starts_with:
@@ -41,8 +53,37 @@ def get_chart_list(host: str = '127.0.0.1:19999', starts_with: str = None) -> li
 # Cell
 
 
+def _add_chart(r, chart: str, host: str, data: list, col_sep: str = '|', numeric_only: bool = True,
+               float_size: str = 'float64', host_prefix: bool = False, host_sep: str = ':',
+               assembler: GridBuffer = None) -> tuple:
+    """Parse the response `r` for `chart` and add it to `assembler` (or append it to `data`), returning its shape."""
+    parsed = parse_chart(r.content, float_size) if numeric_only else None
+    if parsed is not None:
+        times, values, labels = parsed
+        if assembler is not None:
+            assembler.add(host, times, values, chart_columns(labels, chart, host, col_sep, host_prefix, host_sep))
+        else:
+            data.append(chart_frame(parsed, chart, host, col_sep, host_prefix, host_sep))
+        return values.shape
+    r_json = r.json()
+    df = pd.DataFrame(r_json['data'], columns=['time_idx'] + r_json['labels'][1:])
+    if host_prefix:
+        df = df.set_index(['time_idx']).add_prefix(f'{host}{host_sep}{chart}{col_sep}')
+    else:
+        df['host'] = host
+        df = df.set_index(['host','time_idx']).add_prefix(f'{chart}{col_sep}')
+    if numeric_only:
+        df = df._get_numeric_data().astype(float_size)
+    if assembler is not None:
+        assembler.add(host, df.index.get_level_values('time_idx'), df.values, df.columns)
+    else:
+        data.append(df)
+    return df.shape
+
+
 async def get_chart(api_call: str, data: list, col_sep: str ='|', numeric_only: bool = True, float_size: str = 'float64',
-                    host_prefix: bool = False, host_sep: str = ':'):
+                    host_prefix: bool = False, host_sep: str = ':', fetcher: Fetcher = None,
+                    assembler: GridBuffer = None, instrument: Instrument = None):
     """Get data for an individual chart.
 
     ##### Parameters:
@@ -53,24 +94,24 @@ async def get_chart(api_call: str, data: list, col_sep: str ='|', numeric_only:
     - **float_size** `str` float size to use if would like to save some memory, eg can use 'float32' or 'float16'.
     - **host_prefix** `bool` True to prefix each colname with the corresponding host.
     - **host_sep** `str` A character for separating host and chart and dimensions in column names of dataframe.
+    - **fetcher** `Fetcher` The `Fetcher` to make the request with, a new one is used if None.
+    - **assembler** `GridBuffer` If set, the numeric chart data is added to `assembler` instead of appended to `data`.
+    - **instrument** `Instrument` If set, a record of the request is added to `instrument`.
 
     """
     url, chart, host, user, pwd = api_call
-    if user and pwd:
-        user_pwd = (user, pwd)
-        r = await asks.get(url, auth=BasicAuth(user_pwd))
-    else:
-        r = await asks.get(url)
-    r_json = r.json()
-    df = pd.DataFrame(r_json['data'], columns=['time_idx'] + r_json['labels'][1:])
-    if host_prefix:
-        df = df.set_index(['time_idx']).add_prefix(f'{host}{host_sep}{chart}{col_sep}')
-    else:
-        df['host'] = host
-        df = df.set_index(['host','time_idx']).add_prefix(f'{chart}{col_sep}')
-    if numeric_only:
-        df = df._get_numeric_data().astype(float_size)
-    data.append(df)
+    fetcher = fetcher or Fetcher()
+    instrument = instrument or no_instrument
+    record = instrument.request(url, host, chart)
+    try:
+        r = await fetcher.get(url, user, pwd, record=record)
+        with instrument.timing(record, 'parse'):
+            rows, columns = _add_chart(r, chart, host, data, col_sep, numeric_only, float_size, host_prefix, host_sep,
+                                       assembler)
+    except BaseException as e:
+        instrument.finish(record, e)
+        raise
+    instrument.finish(record, rows=rows, columns=columns)
 
 
 
@@ -78,7 +119,9 @@ async def get_chart(api_call: str, data: list, col_sep: str ='|', numeric_only:
 
 
 async def get_charts(api_calls: list, col_sep: str ='|', timeout: int = 60, numeric_only: bool = True, float_size: str = 'float64',
-                     host_prefix: bool = False, host_sep: str = ':') -> pd.DataFrame:
+                     host_prefix: bool = False, host_sep: str = ':', max_connections: int = 100,
+                     max_connections_per_host: int = 8, fetcher: Fetcher = None,
+                     assembler: GridBuffer = None, instrument: Instrument = None) -> pd.DataFrame:
     """Create a nursey to make seperate async calls to get each chart.
 
     ##### Parameters:
@@ -89,35 +132,250 @@ async def get_charts(api_calls: list, col_sep: str ='|', timeout: int = 60, nume
     - **float_size** `str` float size to use if would like to save some memory, eg can use 'float32' or 'float16'.
     - **host_prefix** `bool` True to prefix each colname with the corresponding host.
     - **host_sep** `str` A character for separating host and chart and dimensions in column names of dataframe.
+    - **max_connections** `int` Max number of requests in flight across all hosts.
+    - **max_connections_per_host** `int` Max number of requests in flight (and size of connection pool) for each host.
+    - **fetcher** `Fetcher` A `Fetcher` to make requests with, if None one is created from the connection limits.
+    - **assembler** `GridBuffer` If set, numeric chart data is assembled into one time grid by `assembler` rather than concatenated.
+    - **instrument** `Instrument` If set, a record of each request and the time spent fetching and assembling is added to `instrument`.
 
     ##### Returns:
     - **df** `pd.DataFrame` A pandas dataframe with all chart data outer joined based on time index.
+    Any (host, chart) whose request failed or did not finish within `timeout` is listed in `df.attrs['missing']`.
 
     """
     n_hosts = len(set([x[2] for x in api_calls]))
     data = []
-    with trio.move_on_after(timeout):
-        async with trio.open_nursery() as nursery:
-            for api_call in api_calls:
-                nursery.start_soon(get_chart, api_call, data, col_sep, numeric_only, float_size, host_prefix, host_sep)
-    if n_hosts == 1 or host_prefix:
-        df = pd.concat(data, join='outer', axis=1, sort=True)
-    else:
-        df = pd.concat(data, join='outer', axis=0, sort=True)
+    done, errors = set(), []
+    instrument = instrument or no_instrument
+
+    async def fetch(api_call):
+        # a host that could not be reached leaves a gap rather than failing the whole pull
+        try:
+            await get_chart(api_call, data, col_sep, numeric_only, float_size, host_prefix, host_sep, fetcher,
+                            assembler, instrument)
+        except FetchError as e:
+            errors.append(e)
+        else:
+            done.add(api_call[0])
+
+    with instrument.stage('fetch'):
+        async with (fetcher or Fetcher(max_connections, max_connections_per_host)) as fetcher:
+            async with anyio.move_on_after(timeout):
+                async with anyio.create_task_group() as tg:
+                    for api_call in api_calls:
+                        await tg.spawn(fetch, api_call)
+    if errors and not done:
+        raise errors[0]
+    with instrument.stage('assemble'):
+        if assembler is not None:
+            df = assembler.to_frame()
+        elif n_hosts == 1 or host_prefix:
+            df = pd.concat(data, join='outer', axis=1, sort=True)
+        else:
+            df = pd.concat(data, join='outer', axis=0, sort=True)
+    attrs = getattr(df, 'attrs', None)
+    if attrs is not None:
+        attrs['missing'] = sorted(set((host, chart) for url, chart, host, _, _ in api_calls if url not in done))
+    return df
+
+
+def _post_process(df: pd.DataFrame, sort_rows: bool = True, ffill: bool = True, diff: bool = False,
+                  nunique_thold=None, std_thold: float = None, index_as_datetime: bool = False, freq: str = 'infer',
+                  sort_cols: bool = True) -> pd.DataFrame:
+    """Apply the post processing steps of `get_data` to `df`."""
+    if sort_rows:
+        df = df.sort_index()
+    if ffill:
+        df = df.ffill()
+    if diff:
+        df = df.diff().dropna(how='all')
+    if nunique_thold:
+        df = drop_low_uniqueness_cols(df, nunique_thold)
+    if std_thold:
+        df = drop_low_std_cols(df, std_thold)
+    if index_as_datetime:
+        df = df.set_index(pd.DatetimeIndex(pd.to_datetime(df.index, unit='s'), freq=freq))
+    if sort_cols:
+        df = df.reindex(sorted(df.columns), axis=1)
     return df
 
 
+def _post_process_cube(cube: 'HostCube', ffill: bool = True, diff: bool = False, nunique_thold=None,
+                       std_thold: float = None, index_as_datetime: bool = False, freq: str = 'infer') -> 'HostCube':
+    """Apply the post processing steps of `get_data` to `cube`, along time within each host."""
+    if ffill:
+        cube = cube.ffill()
+    if diff:
+        cube = cube.diff()
+    cube = cube.drop_low_cols(nunique_thold, std_thold)
+    if index_as_datetime:
+        cube.times = pd.DatetimeIndex(pd.to_datetime(cube.times, unit='s'), freq=freq, name='time_idx')
+    return cube
+
+
 
 # Cell
 
 
+async def aget_data(hosts: list = ['london.my-netdata.io'], charts: list = ['system.cpu'], after: int = -60,
+                    before: int = 0, points: int = 0, col_sep: str = '|', numeric_only: bool = True,
+                    ffill: bool = True, diff: bool = False, timeout: int = 60, nunique_thold = None,
+                    std_thold: float = None, index_as_datetime: bool = False, freq: str = 'infer',
+                    group: str = 'average', sort_cols: bool = True, user: str = None, pwd: str = None,
+                    protocol: str = 'http', sort_rows: bool = True, float_size: str = 'float64',
+                    host_charts_dict: dict = None, host_prefix: bool = False, host_sep: str = ':',
+                    max_connections: int = 100, max_connections_per_host: int = 8,
+                    cache: 'ChartCache' = None, chunk_size=None, catalog: 'ChartCatalog' = None,
+                    processes: int = None, sink: 'Sink' = None, early_filter: bool = False,
+                    instrument: Instrument = None, dimensions: list = None, options: list = None,
+                    resample: int = None, gtime: int = None, cube: bool = False, fetcher: Fetcher = None,
+                    request_timeout: float = None, retries: int = 0, hedge_after=None) -> pd.DataFrame:
+    """Awaitable version of `get_data`, for use within an already running trio or asyncio event loop.
+
+    Takes the same parameters as `get_data`, plus:
+
+    ##### Parameters:
+    - **fetcher** `Fetcher` A `Fetcher` to make requests with, eg to share one connection pool between concurrent calls. Its own `request_timeout`, `retries` and `hedge_after` are used, so they can not also be passed.
+
+    ##### Returns:
+    - **df** `pd.DataFrame` The same as `get_data`.
+
+    """
+    if fetcher is not None and (request_timeout or retries or hedge_after):
+        raise ValueError('Set request_timeout, retries and hedge_after on the fetcher rather than passing them with it.')
+    # if hosts is a string make it a list of one
+    if isinstance(hosts, str):
+        hosts = [hosts]
+
+    instrument = instrument or no_instrument
+    undiscovered = []
+    with instrument.stage('plan'):
+        # get list of host chart tuples we need to get data for
+        if catalog is None and (charts == ['all'] or chunk_size == 'auto'):
+            # the opt in modules are imported where they are used, so a plain pull does not pay for importing them
+            from .catalog import default_catalog
+            catalog = default_catalog
+        if host_charts_dict:
+            host_charts = [(k, v) for k in host_charts_dict for v in host_charts_dict[k]]
+            hosts = list(set(host_charts_dict.keys()))
+        elif charts == ['all']:
+            charts_info = await catalog.acharts_info(hosts, user, pwd, protocol, fetcher)
+            host_charts = [(host, chart) for host in hosts for chart in charts_info.get(host, {})]
+            # a host whose charts could not be discovered is missing as a whole
+            undiscovered = [(host, 'all') for host in hosts if host not in charts_info]
+            if undiscovered and not host_charts:
+                raise FetchError(f'Could not discover the charts of any of {hosts}.')
+        else:
+            host_charts = [(host, chart) for host in hosts for chart in charts]
+
+        # have the agents select and reduce the data where asked to
+        options = data_options(options)
+        if resample:
+            after, before, points = resample_points(after, before, resample)
+
+        # split long raw windows into chunks if asked to, overlapping points get merged when assembled
+        chunk_size = chunk_size if points == 0 and numeric_only else None
+        charts_info = await catalog.acharts_info(hosts, user, pwd, protocol, fetcher) if chunk_size == 'auto' else {}
+        chunks = {(host, chart): [(after, before)] for host, chart in host_charts}
+        if chunk_size:
+            now = int(time.time())
+            for host, chart in host_charts:
+                info = charts_info.get(host, {}).get(chart, {})
+                chunks[(host, chart)] = plan_chunks(after, before, chunk_size, info.get('update_every', 1),
+                                                    info.get('first_entry'), now=now)
+        # define list of all api calls to be made
+        api_calls = [
+            (f'{protocol}://{host}/api/v1/data?{data_query(chart, chunk_after, chunk_before, points, group, dimensions, options, gtime)}', chart, host, user, pwd)
+            for host, chart in host_charts for chunk_after, chunk_before in chunks[(host, chart)]
+        ]
+    # numeric data gets written straight into one time grid (or streamed to the sink), anything else is concatenated and grouped
+    if cube and (sink is not None or not numeric_only or host_prefix):
+        raise ValueError('A cube can only be made with numeric_only=True, no host_prefix and no sink.')
+    use_cache = cache is not None and points == 0 and not (dimensions or options or gtime)
+    if sink is not None:
+        if not numeric_only:
+            raise ValueError('A sink can only be used with numeric_only=True.')
+        # the chunks of a chart are joined before post processing so ffill and diff carry over between them
+        n_chunks = {} if use_cache or processes else {
+            host_chart: len(chart_chunks) for host_chart, chart_chunks in chunks.items() if len(chart_chunks) > 1
+        }
+        sink.start(
+            lambda df: _post_process(df, sort_rows, ffill, diff, nunique_thold, std_thold, index_as_datetime, freq, sort_cols),
+            by_time=host_prefix or len(hosts) == 1, n_chunks=n_chunks,
+            chart_of=lambda host, col: (col[len(f'{host}{host_sep}'):] if host_prefix else col).split(col_sep)[0]
+        )
+        assembler = sink
+    elif numeric_only and early_filter:
+        if cube:
+            from .cube import CubeAssembler
+            assembler = CubeAssembler(float_size, nunique_thold, std_thold, diff)
+        else:
+            assembler = GridBuffer(float_size, host_prefix, len(hosts) == 1, nunique_thold, std_thold, diff)
+        # already applied as the data was assembled
+        nunique_thold, std_thold = None, None
+    elif cube:
+        from .cube import CubeAssembler
+        assembler = CubeAssembler(float_size)
+    else:
+        assembler = GridBuffer(float_size, host_prefix, drop_host=len(hosts) == 1) if numeric_only else None
+    if fetcher is None and (request_timeout or retries or hedge_after):
+        fetcher = Fetcher(max_connections, max_connections_per_host, request_timeout, retries, hedge_after=hedge_after)
+    # get the data
+    if use_cache:
+        from .cache import get_charts_cached
+        with instrument.stage('fetch'):
+            df = await get_charts_cached(cache, host_charts, after, before, group, col_sep, timeout, float_size,
+                                         host_prefix, host_sep, user, pwd, protocol, max_connections,
+                                         max_connections_per_host, assembler, chunk_size, charts_info, fetcher)
+    elif processes and assembler is not None:
+        from .shard import get_charts_sharded
+        with instrument.stage('fetch'):
+            df = await anyio.run_sync_in_worker_thread(
+                get_charts_sharded, api_calls, col_sep, timeout, float_size, host_prefix, host_sep, max_connections,
+                max_connections_per_host, processes, assembler
+            )
+    else:
+        df = await get_charts(api_calls, col_sep, timeout, numeric_only, float_size, host_prefix, host_sep,
+                              max_connections, max_connections_per_host, fetcher, assembler, instrument)
+    if sink is not None:
+        return df
+    missing = getattr(df, 'attrs', {}).get('missing')
+    if undiscovered:
+        missing = sorted((missing or []) + undiscovered)
+    if cube:
+        with instrument.stage('post_process'):
+            df = _post_process_cube(df, ffill, diff, nunique_thold, std_thold, index_as_datetime, freq)
+        if missing is not None:
+            df.attrs['missing'] = missing
+        return df
+    # post process the data
+    with instrument.stage('post_process'):
+        if assembler is None:
+            if host_prefix:
+                df = df.groupby(by=['time_idx']).max()
+            else:
+                df = df.groupby(by=['host','time_idx']).max()
+            if len(hosts) == 1:
+                df = df.reset_index(level=0, drop=True)
+        df = _post_process(df, sort_rows, ffill, diff, nunique_thold, std_thold, index_as_datetime, freq, sort_cols)
+    if missing is not None:
+        df.attrs['missing'] = missing
+    return df
+
+
 def get_data(hosts: list = ['london.my-netdata.io'], charts: list = ['system.cpu'], after: int = -60,
              before: int = 0, points: int = 0, col_sep: str = '|', numeric_only: bool = True,
              ffill: bool = True, diff: bool = False, timeout: int = 60, nunique_thold = None,
              std_thold: float = None, index_as_datetime: bool = False, freq: str = 'infer',
              group: str = 'average', sort_cols: bool = True, user: str = None, pwd: str = None,
              protocol: str = 'http', sort_rows: bool = True, float_size: str = 'float64',
-             host_charts_dict: dict = None, host_prefix: bool = False, host_sep: str = ':') -> pd.DataFrame:
+             host_charts_dict: dict = None, host_prefix: bool = False, host_sep: str = ':',
+             max_connections: int = 100, max_connections_per_host: int = 8,
+             cache: 'ChartCache' = None, chunk_size=None, catalog: 'ChartCatalog' = None,
+             processes: int = None, sink: 'Sink' = None, early_filter: bool = False,
+             instrument: Instrument = None, dimensions: list = None, options: list = None, resample: int = None,
+             gtime: int = None, cube: bool = False, request_timeout: float = None, retries: int = 0,
+             hedge_after=None) -> pd.DataFrame:
     """Define api calls to make and any post processing to be done.
 
     ##### Parameters:
@@ -145,53 +403,37 @@ def get_data(hosts: list = ['london.my-netdata.io'], charts: list = ['system.cpu
     - **host_charts_dict** `dict` dictionary of hosts to pull for where each value is list of relevant charts to pull from that host.
     - **host_prefix** `bool` True to prefix each colname with the corresponding host.
     - **host_sep** `str` A character for separating host and chart and dimensions in column names of dataframe.
+    - **max_connections** `int` Max number of requests in flight across all hosts.
+    - **max_connections_per_host** `int` Max number of requests in flight (and size of connection pool) for each host.
+    - **cache** `ChartCache` An optional on disk cache to read raw (`points=0`) data from, only ranges not already cached get fetched. Not used along with `dimensions`, `options` or `gtime`.
+    - **chunk_size** [`int`,`str`] If set, split long raw (`points=0`, `numeric_only`) windows into chunks of this many seconds that are fetched in parallel, or 'auto' to size them from each chart's `update_every` and retention.
+    - **catalog** `ChartCatalog` The catalog to discover charts from for `charts=['all']` (and to size 'auto' chunks), `default_catalog` if None.
+    - **processes** `int` If set, spread the api calls across this many worker processes (`numeric_only` and no `cache`), for very large pulls where parsing on one core is the bottleneck.
+    - **sink** `Sink` If set, each chart's data is post processed on its own and handed to `sink` as soon as it arrives instead of being assembled in memory (`numeric_only` only).
+    - **early_filter** `bool` True to apply `nunique_thold` and `std_thold` as each chart arrives so dropped columns are never assembled, using statistics of each chart's own points (or their differences if `diff`) before any `ffill`.
+    - **instrument** `Instrument` If set, a record of each request and the time spent in each stage is added to `instrument`.
+    - **dimensions** `list` If set, only these dimensions of each chart are asked for.
+    - **options** [`list`,`str`] Netdata `options` for the agents to apply, eg ['nonzero'] to leave out dimensions that are all zero in the window of each request or ['abs'] for absolute values.
+    - **resample** `int` If set, have the agents group the data into one point per `resample` seconds using `group`, in place of `points`.
+    - **gtime** `int` If set, passed on as netdata's `gtime` to report averages per `gtime` seconds.
+    - **cube** `bool` True to return a `HostCube`, one (hosts, times, columns) array, rather than a (host, time) indexed dataframe (`numeric_only` and no `host_prefix`). `ffill` and `diff` are then done within each host.
+    - **request_timeout** `float` If set, the number of seconds to give each attempt at each request, so one slow host can not hold up the whole pull until `timeout`.
+    - **retries** `int` Number of times to retry a request that failed to connect, timed out or got a 5xx response, with a backoff between attempts.
+    - **hedge_after** [`float`,`str`] If set, the number of seconds after which to send a duplicate of a request that has not answered and take whichever answers first, or 'auto' to hedge once a request has taken 3 times its host's usual latency.
 
     ##### Returns:
     - **df** `pd.DataFrame` A pandas dataframe with all chart data outer joined based on time index and any post processing done.
+    If a `sink` is set, what its `to_frame()` returns instead, eg a `SinkReader` for the files written by a `ParquetSink`.
+    If `cube` is set, a `HostCube` instead.
+    Any (host, chart) that could not be fetched is left out and listed in `df.attrs['missing']`, an error is only raised if none could be.
+    With `charts=['all']` a host whose charts could not be discovered is listed as (host, 'all').
 
     """
-    # if hosts is a string make it a list of one
-    if isinstance(hosts, str):
-        hosts = [hosts]
-
-    # get list of host chart tuples we need to get data for
-    if host_charts_dict:
-        host_charts = [(k, v) for k in host_charts_dict for v in host_charts_dict[k]]
-        hosts = list(set(host_charts_dict.keys()))
-    elif charts == ['all']:
-        host_charts = [(host, chart) for host in hosts for chart in get_chart_list(host)]
-    else:
-        host_charts = [(host, chart) for host in hosts for chart in charts]
-
-    # define list of all api calls to be made
-    api_calls = [
-        (f'{protocol}://{host_chart[0]}/api/v1/data?chart={host_chart[1]}&after={after}&before={before}&points={points}&format=json&group={group}', host_chart[1], host_chart[0], user, pwd)
-        for host_chart in host_charts
-    ]
-    # get the data
-    df = trio.run(get_charts, api_calls, col_sep, timeout, numeric_only, float_size, host_prefix, host_sep)
-    # post process the data
-    if host_prefix:
-        df = df.groupby(by=['time_idx']).max()
-    else:
-        df = df.groupby(by=['host','time_idx']).max()
-    if len(hosts) == 1:
-        df = df.reset_index(level=0, drop=True)
-    if sort_rows:
-        df = df.sort_index()
-    if ffill:
-        df = df.ffill()
-    if diff:
-        df = df.diff().dropna(how='all')
-    if nunique_thold:
-        df = drop_low_uniqueness_cols(df, nunique_thold)
-    if std_thold:
-        df = drop_low_std_cols(df, std_thold)
-    if index_as_datetime:
-        df = df.set_index(pd.DatetimeIndex(pd.to_datetime(df.index, unit='s'), freq=freq))
-    if sort_cols:
-        df = df.reindex(sorted(df.columns), axis=1)
-    return df
+    return trio.run(aget_data, hosts, charts, after, before, points, col_sep, numeric_only, ffill, diff, timeout,
+                    nunique_thold, std_thold, index_as_datetime, freq, group, sort_cols, user, pwd, protocol, sort_rows,
+                    float_size, host_charts_dict, host_prefix, host_sep, max_connections, max_connections_per_host, cache,
+                    chunk_size, catalog, processes, sink, early_filter, instrument, dimensions, options, resample, gtime, cube,
+                    None, request_timeout, retries, hedge_after)
 
 
 
@@ -199,7 +441,7 @@ def get_data(hosts: list = ['london.my-netdata.io'], charts: list = ['system.cpu
 
 
 def get_alarm_log(host: str = '127.0.0.1:19999', datetimes: bool = True, user: str = None,
-                  pwd: str = None, protocol: str = 'http') -> pd.DataFrame:
+                  pwd: str = None, protocol: str = 'http', instrument: Instrument = None) -> pd.DataFrame:
     """Get alarm log from `host`.
 
     ##### Parameters:
@@ -207,6 +449,7 @@ def get_alarm_log(host: str = '127.0.0.1:19999', datetimes: bool = True, user: s
     - **user** `str` A username to use if netdata is password protected.
     - **pwd** `str` A password to use if netdata is password protected.
     - **protocol** `str` 'http' or 'https'.
+    - **instrument** `Instrument` If set, a record of the request is added to `instrument`.
 
     ##### Returns:
     - **df** `pd.DataFrame` A df of the alarm_log.
@@ -214,15 +457,21 @@ def get_alarm_log(host: str = '127.0.0.1:19999', datetimes: bool = True, user: s
     """
 
     url = f"{protocol}://{host}/api/v1/alarm_log"
-    if user and pwd:
-        r = requests.get(url, auth=HTTPBasicAuth(user, pwd))
-    else:
-        r = requests.get(url)
-    alarm_log = r.json()
-    df = pd.DataFrame(alarm_log)
-    if datetimes:
-        for col in ['when', 'delay_up_to_timestamp']:
-            df[col] = pd.to_datetime(df[col], unit='s')
+    instrument = instrument or no_instrument
+    record = instrument.request(url, host)
+    try:
+        with instrument.timing(record, 'transfer'):
+            r = _sync_get(url, user, pwd)
+        with instrument.timing(record, 'parse'):
+            alarm_log = r.json()
+            df = pd.DataFrame(alarm_log)
+            if datetimes:
+                for col in ['when', 'delay_up_to_timestamp']:
+                    df[col] = pd.to_datetime(df[col], unit='s')
+    except BaseException as e:
+        instrument.finish(record, e)
+        raise
+    instrument.finish(record, status_code=r.status_code, bytes=len(r.content), rows=df.shape[0], columns=df.shape[1])
     return df
 
 
@@ -233,7 +482,7 @@ def get_alarm_log(host: str = '127.0.0.1:19999', datetimes: bool = True, user: s
 def get_allmetrics(host='london.my-netdata.io', charts: list = None, wide: bool = False, col_sep: str = '|', sort_cols: bool = True,
                    user: str = None, pwd: str = None, protocol: str = 'http', numeric_only: bool = True,
                    float_size: str = 'float64', host_charts_dict: dict = None, host_prefix: bool = False,
-                   host_sep: str = ':') -> pd.DataFrame:
+                   host_sep: str = ':', instrument: Instrument = None) -> pd.DataFrame:
     """Get allmetrics into a df.
 
     ##### Parameters:
@@ -245,6 +494,7 @@ def get_allmetrics(host='london.my-netdata.io', charts: list = None, wide: bool
     - **protocol** `str` 'http' or 'https'.
     - **numeric_only** `bool` Set to true if you want to filter out any non numeric data.
     - **float_size** `str` float size to use if would like to save some memory, eg can use 'float32' or 'float16'.
+    - **instrument** `Instrument` If set, a record of each request is added to `instrument`.
 
     ##### Returns:
     - **df** `pd.DataFrame` A df of the latest data from allmetrics.
@@ -254,14 +504,21 @@ def get_allmetrics(host='london.my-netdata.io', charts: list = None, wide: bool
     if not host_charts_dict:
         host_charts_dict = {host: charts}
 
+    instrument = instrument or no_instrument
     data = []
     for host in host_charts_dict:
         charts = host_charts_dict[host]
         url = f'{protocol}://{host}/api/v1/allmetrics?format=json'
-        if user and pwd:
-            raw_data = requests.get(url, auth=HTTPBasicAuth(user, pwd)).json()
-        else:
-            raw_data = requests.get(url).json()
+        record = instrument.request(url, host)
+        try:
+            with instrument.timing(record, 'transfer'):
+                r = _sync_get(url, user, pwd)
+            with instrument.timing(record, 'parse'):
+                raw_data = r.json()
+        except BaseException as e:
+            instrument.finish(record, e)
+            raise
+        instrument.finish(record, status_code=r.status_code, bytes=len(r.content))
         if charts is None:
             charts = list(raw_data.keys())
         for k in raw_data:
@@ -293,26 +550,10 @@ def get_allmetrics(host='london.my-netdata.io', charts: list = None, wide: bool
 # Cell
 
 
-async def _get_allmetrics_async_single(api_call: str, data: list, col_sep: str ='|', numeric_only: bool = True, float_size: str = 'float64',
-                    host_prefix: bool = False, host_sep: str = ':', wide: bool = False, sort_cols: bool = True):
-    """Get all metrics for individual host.
-
-    ##### Parameters:
-    - **api_call** `tuple` A tuple of (`url`,`chart`) for the url to pull data from and chart it represents.
-    - **data** `list` A list for dataframes for each chart to be appended to.
-    - **col_sep** `str` A character for separating chart and dimension in column names of dataframe.
-    - **numeric_only** `bool` Set to true if you want to filter out any non numeric data.
-    - **float_size** `str` float size to use if would like to save some memory, eg can use 'float32' or 'float16'.
-    - **host_prefix** `bool` True to prefix each colname with the corresponding host.
-    - **host_sep** `str` A character for separating host and chart and dimensions in column names of dataframe.
-
-    """
-    url, host, charts, user, pwd = api_call
-    if user and pwd:
-        user_pwd = (user, pwd)
-        r = await asks.get(url, auth=BasicAuth(user_pwd))
-    else:
-        r = await asks.get(url)
+def _allmetrics_frame(r, host: str, charts: list = None, col_sep: str = '|', numeric_only: bool = True,
+                      float_size: str = 'float64', host_prefix: bool = False, host_sep: str = ':', wide: bool = False,
+                      sort_cols: bool = True) -> pd.DataFrame:
+    """Parse the allmetrics response `r` from `host` into a dataframe."""
     raw_data = r.json()
     if charts is None:
         charts = list(raw_data.keys())
@@ -339,7 +580,39 @@ async def _get_allmetrics_async_single(api_call: str, data: list, col_sep: str =
             df = df.reindex(sorted(df.columns), axis=1)
         if numeric_only:
             df = df._get_numeric_data().astype(float_size)
+    return df
+
+
+async def _get_allmetrics_async_single(api_call: str, data: list, col_sep: str ='|', numeric_only: bool = True, float_size: str = 'float64',
+                    host_prefix: bool = False, host_sep: str = ':', wide: bool = False, sort_cols: bool = True,
+                    fetcher: Fetcher = None, instrument: Instrument = None):
+    """Get all metrics for individual host.
 
+    ##### Parameters:
+    - **api_call** `tuple` A tuple of (`url`,`chart`) for the url to pull data from and chart it represents.
+    - **data** `list` A list for dataframes for each chart to be appended to.
+    - **col_sep** `str` A character for separating chart and dimension in column names of dataframe.
+    - **numeric_only** `bool` Set to true if you want to filter out any non numeric data.
+    - **float_size** `str` float size to use if would like to save some memory, eg can use 'float32' or 'float16'.
+    - **host_prefix** `bool` True to prefix each colname with the corresponding host.
+    - **host_sep** `str` A character for separating host and chart and dimensions in column names of dataframe.
+    - **fetcher** `Fetcher` The `Fetcher` to make the request with, a new one is used if None.
+    - **instrument** `Instrument` If set, a record of the request is added to `instrument`.
+
+    """
+    url, host, charts, user, pwd = api_call
+    fetcher = fetcher or Fetcher()
+    instrument = instrument or no_instrument
+    record = instrument.request(url, host)
+    try:
+        r = await fetcher.get(url, user, pwd, record=record)
+        with instrument.timing(record, 'parse'):
+            df = _allmetrics_frame(r, host, charts, col_sep, numeric_only, float_size, host_prefix, host_sep, wide,
+                                   sort_cols)
+    except BaseException as e:
+        instrument.finish(record, e)
+        raise
+    instrument.finish(record, rows=df.shape[0], columns=df.shape[1])
     data.append(df)
 
 
@@ -348,7 +621,9 @@ async def _get_allmetrics_async_single(api_call: str, data: list, col_sep: str =
 
 
 async def _get_allmetrics_async_runner(api_calls: list, col_sep: str ='|', timeout: int = 60, numeric_only: bool = True, float_size: str = 'float64',
-                     host_prefix: bool = False, host_sep: str = ':', wide: bool = False, sort_cols: bool = True) -> pd.DataFrame:
+                     host_prefix: bool = False, host_sep: str = ':', wide: bool = False, sort_cols: bool = True,
+                     max_connections: int = 100, max_connections_per_host: int = 8, fetcher: Fetcher = None,
+                     instrument: Instrument = None) -> pd.DataFrame:
     """Create a nursey to make seperate async calls to get each chart.
 
     ##### Parameters:
@@ -359,6 +634,10 @@ async def _get_allmetrics_async_runner(api_calls: list, col_sep: str ='|', timeo
     - **float_size** `str` float size to use if would like to save some memory, eg can use 'float32' or 'float16'.
     - **host_prefix** `bool` True to prefix each colname with the corresponding host.
     - **host_sep** `str` A character for separating host and chart and dimensions in column names of dataframe.
+    - **max_connections** `int` Max number of requests in flight across all hosts.
+    - **max_connections_per_host** `int` Max number of requests in flight (and size of connection pool) for each host.
+    - **fetcher** `Fetcher` A `Fetcher` to make requests with, if None one is created from the connection limits.
+    - **instrument** `Instrument` If set, a record of each request and the time spent fetching and assembling is added to `instrument`.
 
     ##### Returns:
     - **df** `pd.DataFrame` A pandas dataframe with all chart data outer joined based on time index.
@@ -366,14 +645,18 @@ async def _get_allmetrics_async_runner(api_calls: list, col_sep: str ='|', timeo
     """
     n_hosts = len(set([x[1] for x in api_calls]))
     data = []
-    with trio.move_on_after(timeout):
-        async with trio.open_nursery() as nursery:
-            for api_call in api_calls:
-                nursery.start_soon(_get_allmetrics_async_single, api_call, data, col_sep, numeric_only, float_size, host_prefix, host_sep, wide, sort_cols)
-    if n_hosts == 1:
-        df = pd.concat(data, join='outer', axis=1, sort=True)
-    else:
-        df = pd.concat(data, join='outer', axis=0, sort=True)
+    instrument = instrument or no_instrument
+    with instrument.stage('fetch'):
+        async with (fetcher or Fetcher(max_connections, max_connections_per_host)) as fetcher:
+            async with anyio.move_on_after(timeout):
+                async with anyio.create_task_group() as tg:
+                    for api_call in api_calls:
+                        await tg.spawn(_get_allmetrics_async_single, api_call, data, col_sep, numeric_only, float_size, host_prefix, host_sep, wide, sort_cols, fetcher, instrument)
+    with instrument.stage('assemble'):
+        if n_hosts == 1:
+            df = pd.concat(data, join='outer', axis=1, sort=True)
+        else:
+            df = pd.concat(data, join='outer', axis=0, sort=True)
     return df
 
 
@@ -381,10 +664,45 @@ async def _get_allmetrics_async_runner(api_calls: list, col_sep: str ='|', timeo
 # Cell
 
 
+async def aget_allmetrics(host_charts_dict: dict = None, col_sep: str = '|', numeric_only: bool = True,
+                   timeout: int = 60, index_as_datetime: bool = False, freq: str = 'infer', sort_cols: bool = True, user: str = None,
+                   pwd: str = None, protocol: str = 'http', float_size: str = 'float64',
+                   host_prefix: bool = False, host_sep: str = ':', wide: bool = False, max_connections: int = 100,
+                   max_connections_per_host: int = 8, instrument: Instrument = None, fetcher: Fetcher = None) -> pd.DataFrame:
+    """Awaitable version of `get_allmetrics_async`, for use within an already running trio or asyncio event loop.
+
+    Takes the same parameters as `get_allmetrics_async`, plus:
+
+    ##### Parameters:
+    - **fetcher** `Fetcher` A `Fetcher` to make requests with, eg to share one connection pool between concurrent calls.
+
+    ##### Returns:
+    - **df** `pd.DataFrame` The same as `get_allmetrics_async`.
+
+    """
+    # define list of all api calls to be made
+    api_calls = [
+        (f'{protocol}://{host}/api/v1/allmetrics?format=json', host, host_charts_dict[host], user, pwd)
+        for host in host_charts_dict
+    ]
+    # get the data
+    df = await _get_allmetrics_async_runner(api_calls, col_sep, timeout, numeric_only, float_size, host_prefix, host_sep,
+                                            wide, sort_cols, max_connections, max_connections_per_host, fetcher, instrument)
+    #df = df.max().to_frame()
+    df = df.groupby(by=df.index).max()
+    if index_as_datetime:
+        df['time_idx'] = int(time.time())
+        df = df.set_index('time_idx')
+    if sort_cols:
+        df = df.reindex(sorted(df.columns), axis=1)
+    return df
+
+
 def get_allmetrics_async(host_charts_dict: dict = None, col_sep: str = '|', numeric_only: bool = True,
                    timeout: int = 60, index_as_datetime: bool = False, freq: str = 'infer', sort_cols: bool = True, user: str = None,
                    pwd: str = None, protocol: str = 'http', float_size: str = 'float64',
-                   host_prefix: bool = False, host_sep: str = ':', wide: bool = False) -> pd.DataFrame:
+                   host_prefix: bool = False, host_sep: str = ':', wide: bool = False, max_connections: int = 100,
+                   max_connections_per_host: int = 8, instrument: Instrument = None) -> pd.DataFrame:
     """Define api calls to make and any post processing to be done.
 
     ##### Parameters:
@@ -401,25 +719,16 @@ def get_allmetrics_async(host_charts_dict: dict = None, col_sep: str = '|', nume
     - **host_charts_dict** `dict` dictionary of hosts to pull for where each value is list of relevant charts to pull from that host.
     - **host_prefix** `bool` True to prefix each colname with the corresponding host.
     - **host_sep** `str` A character for separating host and chart and dimensions in column names of dataframe.
+    - **wide** `bool` True if you want to return the data in wide format as opposed to long.
+    - **max_connections** `int` Max number of requests in flight across all hosts.
+    - **max_connections_per_host** `int` Max number of requests in flight (and size of connection pool) for each host.
+    - **instrument** `Instrument` If set, a record of each request and the time spent in each stage is added to `instrument`.
 
     ##### Returns:
     - **df** `pd.DataFrame` A pandas dataframe with all chart data outer joined based on time index and any post processing done.
 
     """
-
-    # define list of all api calls to be made
-    api_calls = [
-        (f'{protocol}://{host}/api/v1/allmetrics?format=json', host, host_charts_dict[host], user, pwd)
-        for host in host_charts_dict
-    ]
-    # get the data
-    df = trio.run(_get_allmetrics_async_runner, api_calls, col_sep, timeout, numeric_only, float_size, host_prefix, host_sep, wide, sort_cols)
-    #df = df.max().to_frame()
-    df = df.groupby(by=df.index).max()
-    if index_as_datetime:
-        df['time_idx'] = int(time.time())
-        df = df.set_index('time_idx')
-    if sort_cols:
-        df = df.reindex(sorted(df.columns), axis=1)
-    return df
+    return trio.run(aget_allmetrics, host_charts_dict, col_sep, numeric_only, timeout, index_as_datetime, freq, sort_cols,
+                    user, pwd, protocol, float_size, host_prefix, host_sep, wide, max_connections, max_connections_per_host,
+                    instrument)
 
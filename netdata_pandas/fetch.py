@@ -0,0 +1,218 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: 04_fetch.ipynb (unless otherwise specified).
+
+__all__ = ['FetchError', 'HostHealth', 'Fetcher']
+
+# Cell
+# export
+import base64
+from functools import partial
+import math
+import time
+from urllib.parse import urlsplit
+import anyio
+import asks
+
+# Cell
+
+
+class FetchError(OSError):
+    """A request that failed to connect or timed out on every attempt."""
+
+
+class HostHealth:
+    """The usual latency of a host, as a moving average, and how many requests to it have failed.
+
+    ##### Parameters:
+    - **alpha** `float` The weight of each new latency in the moving average.
+    - **unhealthy_after** `int` Number of failures in a row after which the host is taken to be unhealthy.
+    - **slow_after** `float` Number of seconds of usual latency over which the host is taken to be unhealthy, never if None.
+
+    """
+
+    def __init__(self, alpha: float = 0.2, unhealthy_after: int = 3, slow_after: float = None):
+        self.alpha = alpha
+        self.unhealthy_after = unhealthy_after
+        self.slow_after = slow_after
+        self.latency = None
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+
+    def success(self, seconds: float):
+        self.requests += 1
+        self.consecutive_failures = 0
+        self.latency = seconds if self.latency is None else self.alpha * seconds + (1 - self.alpha) * self.latency
+
+    def failure(self):
+        self.requests += 1
+        self.failures += 1
+        self.consecutive_failures += 1
+
+    @property
+    def slow(self) -> bool:
+        return self.slow_after is not None and self.latency is not None and self.latency > self.slow_after
+
+    @property
+    def healthy(self) -> bool:
+        return self.consecutive_failures < self.unhealthy_after and not self.slow
+
+
+class Fetcher:
+    """A bounded concurrency, connection pooled http engine for netdata agents.
+
+    ##### Parameters:
+    - **max_connections** `int` Max number of requests in flight across all hosts.
+    - **max_connections_per_host** `int` Max number of requests in flight (and size of connection pool) for each host.
+    - **request_timeout** `float` Number of seconds to give each attempt at a request, no limit if None.
+    - **retries** `int` Number of times to retry a request that failed to connect, timed out or got a 5xx response.
+    - **backoff** `float` Number of seconds to wait before the first retry, doubling for each one after.
+    - **hedge_after** [`float`,`str`] Number of seconds after which to send a duplicate of a request that has not answered, or 'auto'.
+    - **slow_after** `float` Number of seconds of usual latency over which a host is taken to be unhealthy, never if None.
+    - **health** `dict` A dict to keep the `HostHealth` of each host in, a new one if None.
+
+    """
+
+    def __init__(self, max_connections: int = 100, max_connections_per_host: int = 8, request_timeout: float = None,
+                 retries: int = 0, backoff: float = 0.1, hedge_after=None, slow_after: float = 10, health: dict = None):
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.request_timeout = request_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.hedge_after = hedge_after
+        self.slow_after = slow_after
+        self.health = {} if health is None else health
+        self.retried = 0
+        self.hedged = 0
+        self._sessions = {}
+        self._host_limiters = {}
+        self._limiter = None
+        self._entered = 0
+
+    async def __aenter__(self):
+        self._entered += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        self._entered = max(0, self._entered - 1)
+        if not self._entered:
+            await self.aclose()
+
+    async def aclose(self):
+        """Close all pooled connections."""
+        sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            await session.close()
+
+    def _session(self, base: str, user: str = None, pwd: str = None) -> asks.Session:
+        """Get (or create) the pooled session for `base` and credentials."""
+        key = (base, user, pwd)
+        if key not in self._sessions:
+            headers = {'Connection': 'keep-alive'}
+            if user and pwd:
+                token = base64.b64encode(f'{user}:{pwd}'.encode('utf-8')).decode('ascii')
+                headers['Authorization'] = f'Basic {token}'
+            self._sessions[key] = asks.Session(base, headers=headers, connections=self.max_connections_per_host)
+        return self._sessions[key]
+
+    def _host_limiter(self, base: str):
+        if base not in self._host_limiters:
+            self._host_limiters[base] = anyio.create_capacity_limiter(self.max_connections_per_host)
+        return self._host_limiters[base]
+
+    async def get(self, url: str, user: str = None, pwd: str = None, headers: dict = None, follow_redirects: bool = True,
+                  record: dict = None):
+        """Make a GET request to `url` once there is capacity for it, reusing a pooled connection where possible.
+
+        ##### Parameters:
+        - **url** `str` The full url to request.
+        - **user** `str` A username to use if netdata is password protected.
+        - **pwd** `str` A password to use if netdata is password protected.
+        - **headers** `dict` Any extra headers to send with the request.
+        - **follow_redirects** `bool` False to return 3xx responses (eg a 304 Not Modified) rather than follow them.
+        - **record** `dict` If set, an `Instrument` request record to fill in the wait and transfer time, status and size of.
+
+        ##### Returns:
+        - **r** `asks.response_objects.Response` The response.
+
+        """
+        scheme, netloc, path, query, _ = urlsplit(url)
+        base = f'{scheme}://{netloc}'
+        if self._limiter is None:
+            self._limiter = anyio.create_capacity_limiter(self.max_connections)
+        health = self.health.setdefault(base, HostHealth(slow_after=self.slow_after))
+        # an unhealthy host gets one plain attempt so it does not use up the time of the whole pull
+        attempts = self.retries + 1 if health.healthy else 1
+        send = partial(self._send, base, f'{path}?{query}' if query else path, user, pwd, headers, follow_redirects,
+                       record)
+        for attempt in range(attempts):
+            if attempt:
+                self.retried += 1
+                await anyio.sleep(self.backoff * 2 ** (attempt - 1))
+            try:
+                async with anyio.fail_after(self.request_timeout or math.inf):
+                    r, seconds = await self._hedged(send, self._hedge_delay(health))
+            except (OSError, asks.errors.AsksException) as e:
+                # TimeoutError is an OSError
+                health.failure()
+                error = e
+                continue
+            if r.status_code >= 500:
+                health.failure()
+                if attempt < attempts - 1:
+                    continue
+            else:
+                health.success(seconds)
+            return r
+        raise FetchError(f'GET {url} failed after {attempts} attempt(s): {error!r}') from error
+
+    async def _send(self, base: str, path: str, user: str = None, pwd: str = None, headers: dict = None,
+                    follow_redirects: bool = True, record: dict = None):
+        """Make one request once there is capacity for it, returning the response and how long it took once sent."""
+        session = self._session(base, user, pwd)
+        start = time.perf_counter()
+        async with self._host_limiter(base):
+            async with self._limiter:
+                sent = time.perf_counter()
+                r = await session.get(path=path, headers=headers, follow_redirects=follow_redirects)
+        transfer = time.perf_counter() - sent
+        if record is not None:
+            record.update(wait=sent - start, transfer=transfer, status_code=r.status_code, bytes=len(r.content))
+        return r, transfer
+
+    def _hedge_delay(self, health: HostHealth) -> float:
+        """Seconds after which to hedge a request to the host of `health`, None to not hedge."""
+        if self.hedge_after == 'auto':
+            return None if health.latency is None or not health.healthy else max(0.05, 3 * health.latency)
+        return self.hedge_after if health.healthy else None
+
+    async def _hedged(self, send, delay: float = None):
+        """Await `send()`, and a duplicate of it once `delay` seconds have passed, returning the first to answer.
+
+        Only raises, with the first failure, if neither answers.
+        """
+        if delay is None:
+            return await send()
+        result, errors = [], []
+
+        async def race(wait):
+            if wait:
+                await anyio.sleep(wait)
+                self.hedged += 1
+            try:
+                r = await send()
+            except (OSError, asks.errors.AsksException) as e:
+                # keep the other racer going, rather than have the task group raise both failures together
+                errors.append(e)
+                return
+            if not result:
+                result.append(r)
+                await tg.cancel_scope.cancel()
+
+        async with anyio.create_task_group() as tg:
+            await tg.spawn(race, 0)
+            await tg.spawn(race, delay)
+        if not result:
+            raise FetchError(f'Both the request and its hedge failed: {errors[0]!r}') from errors[0]
+        return result[0]
+
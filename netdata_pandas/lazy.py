@@ -0,0 +1,164 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: 16_lazy.ipynb (unless otherwise specified).
+
+__all__ = ['LazyFrame']
+
+# Cell
+# export
+from functools import reduce
+import re
+import pandas as pd
+import trio
+from .catalog import ChartCatalog, default_catalog
+from .parse import chart_columns
+from .plan import resolve_window, resample_points
+
+# Cell
+
+
+class LazyFrame:
+    """A lazy `get_data` result, fetching the charts behind its columns only as they are selected.
+
+    Takes the same parameters as `get_data` (numeric data only), plus:
+
+    ##### Parameters:
+    - **catalog** `ChartCatalog` The catalog to read the available charts and dimensions from, `default_catalog` if None.
+
+    """
+
+    def __init__(self, hosts: list = ['london.my-netdata.io'], charts: list = ['all'], after: int = -60, before: int = 0,
+                 points: int = 0, col_sep: str = '|', ffill: bool = True, diff: bool = False, timeout: int = 60,
+                 nunique_thold=None, std_thold: float = None, index_as_datetime: bool = False, freq: str = 'infer',
+                 group: str = 'average', sort_cols: bool = True, user: str = None, pwd: str = None,
+                 protocol: str = 'http', sort_rows: bool = True, float_size: str = 'float64', host_prefix: bool = False,
+                 host_sep: str = ':', max_connections: int = 100, max_connections_per_host: int = 8,
+                 catalog: ChartCatalog = None, dimensions: list = None, options: list = None, resample: int = None,
+                 gtime: int = None):
+        if isinstance(hosts, str):
+            hosts = [hosts]
+        self.hosts, self.charts = hosts, charts
+        if resample:
+            after, before, points = resample_points(after, before, resample)
+        else:
+            after, before = resolve_window(after, before)
+        self.after, self.before, self.points, self.group = after, before, points, group
+        self.col_sep, self.host_prefix, self.host_sep = col_sep, host_prefix, host_sep
+        self.ffill, self.diff, self.nunique_thold, self.std_thold = ffill, diff, nunique_thold, std_thold
+        self.index_as_datetime, self.freq, self.sort_cols, self.sort_rows = index_as_datetime, freq, sort_cols, sort_rows
+        self.float_size, self.timeout = float_size, timeout
+        self.user, self.pwd, self.protocol = user, pwd, protocol
+        self.max_connections, self.max_connections_per_host = max_connections, max_connections_per_host
+        self.catalog = catalog or default_catalog
+        self.dimensions, self.options, self.gtime = dimensions, options, gtime
+        self._sources = None
+        self._fetched = set()
+        self._frames = []
+
+    async def _aload(self, fetcher=None):
+        """Map each column to the (host, chart) pairs it comes from, from the catalog's chart metadata."""
+        if self._sources is not None:
+            return
+        charts_info = await self.catalog.acharts_info(self.hosts, self.user, self.pwd, self.protocol, fetcher)
+        sources = {}
+        for host in self.hosts:
+            host_charts = charts_info.get(host, {})
+            for chart in (host_charts if self.charts == ['all'] else [c for c in self.charts if c in host_charts]):
+                dims = self.catalog.dimensions(host, chart)
+                if self.dimensions:
+                    dims = [dim for dim in dims if dim in self.dimensions]
+                for col in chart_columns(dims, chart, host, self.col_sep, self.host_prefix, self.host_sep):
+                    sources.setdefault(col, []).append((host, chart))
+        self._sources = sources
+
+    @property
+    def columns(self) -> pd.Index:
+        """Every column available, without fetching any data."""
+        if self._sources is None:
+            trio.run(self._aload)
+        return pd.Index(sorted(self._sources))
+
+    @property
+    def fetched(self) -> list:
+        """The (host, chart) pairs fetched so far."""
+        return sorted(self._fetched)
+
+    def filter(self, like: str = None, regex: str = None) -> list:
+        """The columns whose name contains `like` or matches `regex`, without fetching any data."""
+        return [
+            col for col in self.columns
+            if (like is None or like in col) and (regex is None or re.search(regex, col))
+        ]
+
+    def _charts_of(self, columns: list) -> set:
+        missing = [col for col in columns if col not in self._sources]
+        if missing:
+            raise KeyError(f'{missing} not in columns.')
+        return set(source for col in columns for source in self._sources[col])
+
+    async def afetch(self, columns: list = None, fetcher=None):
+        """Fetch, in one concurrent round, every chart behind `columns` (all if None) that has not been fetched yet.
+
+        ##### Parameters:
+        - **columns** `list` The columns to fetch the charts of.
+        - **fetcher** `Fetcher` A `Fetcher` to make requests with, if None one is created from the connection limits.
+
+        """
+        # imported here as data is the heavier module
+        from .data import aget_data
+        await self._aload(fetcher)
+        needed = self._charts_of(self._sources if columns is None else columns) - self._fetched
+        if not needed:
+            return
+        host_charts_dict = {}
+        for host, chart in sorted(needed):
+            host_charts_dict.setdefault(host, []).append(chart)
+        df = await aget_data(
+            after=self.after, before=self.before, points=self.points, col_sep=self.col_sep, ffill=False,
+            timeout=self.timeout, group=self.group, sort_cols=False, user=self.user, pwd=self.pwd,
+            protocol=self.protocol, float_size=self.float_size, host_charts_dict=host_charts_dict,
+            host_prefix=self.host_prefix, host_sep=self.host_sep, max_connections=self.max_connections,
+            max_connections_per_host=self.max_connections_per_host, catalog=self.catalog, dimensions=self.dimensions,
+            options=self.options, gtime=self.gtime, fetcher=fetcher
+        )
+        if len(host_charts_dict) == 1 and len(self.hosts) > 1 and not self.host_prefix:
+            # a round from one host comes back without the host level the other rounds have
+            df = pd.concat({list(host_charts_dict)[0]: df}, names=['host'])
+        self._frames.append(df)
+        self._fetched |= needed
+
+    def fetch(self, columns: list = None):
+        """Fetch every chart behind `columns` (all if None) that has not been fetched yet."""
+        trio.run(self.afetch, columns)
+
+    def _frame(self, columns: list) -> pd.DataFrame:
+        """Combine the fetched data of `columns` and post process it as `get_data` would."""
+        frames = [df[[col for col in columns if col in df.columns]] for df in self._frames]
+        frames = [df for df in frames if len(df.columns)]
+        if not frames:
+            return pd.DataFrame(columns=[])
+        # with no host prefix the same column can come from different hosts in different rounds
+        df = reduce(lambda a, b: a.combine_first(b), frames)
+        # imported here as data is the heavier module
+        from .data import _post_process
+        return _post_process(df, self.sort_rows, self.ffill, self.diff, self.nunique_thold, self.std_thold,
+                             self.index_as_datetime, self.freq, self.sort_cols)
+
+    def __getitem__(self, columns):
+        """Fetch the charts of `columns` if needed and return them, a series if `columns` is a single column name."""
+        single = isinstance(columns, str)
+        columns = [columns] if single else list(columns)
+        self.fetch(columns)
+        df = self._frame(columns)
+        if single:
+            return df[columns[0]]
+        return df[[col for col in columns if col in df.columns]]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Fetch whatever has not been fetched yet and return the whole dataframe, as `get_data` would."""
+        self.fetch()
+        return self._frame(list(self._sources))
+
+    def __repr__(self):
+        n_charts = len(set(source for sources in (self._sources or {}).values() for source in sources))
+        n_columns = '?' if self._sources is None else len(self._sources)
+        return f'<LazyFrame of {n_columns} columns, {len(self._fetched)} of {n_charts} charts fetched>'
+
@@ -0,0 +1,326 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: 02_mock.ipynb (unless otherwise specified).
+
+__all__ = ['MockNetdata']
+
+# Cell
+# export
+import base64
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+
+# Cell
+
+
+_API_RELATIVE_TIME_MAX = 3 * 365 * 86400
+
+
+def _resolve_window(after: int, before: int, now: int) -> tuple:
+    """Resolve the netdata style (possibly relative) `after` and `before` into absolute timestamps.
+
+    ##### Parameters:
+    - **after** `int` The timestamp or relative integer from which to pull data after.
+    - **before** `int` The timestamp or relative integer from which to pull data before.
+    - **now** `int` The timestamp relative values are resolved against.
+
+    ##### Returns:
+    - **(after, before)** `tuple` Absolute timestamps.
+
+    """
+    if abs(before) <= _API_RELATIVE_TIME_MAX:
+        before = now + before
+    if abs(after) <= _API_RELATIVE_TIME_MAX:
+        after = before + after
+    return after, before
+
+
+
+# Cell
+
+
+class _MockServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 1024
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body, headers: dict = None):
+        payload = json.dumps(body).encode('utf-8') if body is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        mock, host = self.server.mock, self.server.host
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        mock._record(host, url.path, params, self.client_address)
+        try:
+            self._respond(mock, host, url, params)
+        except (BrokenPipeError, ConnectionResetError):
+            # the client gave up on the request, eg on a timeout
+            pass
+        finally:
+            mock._done(host)
+
+    def _respond(self, mock, host: str, url, params: dict):
+        latency = mock._host_latency(host)
+        if latency:
+            time.sleep(latency)
+        if mock.user and mock.pwd:
+            expected = 'Basic ' + base64.b64encode(f'{mock.user}:{mock.pwd}'.encode('utf-8')).decode('ascii')
+            if self.headers.get('Authorization') != expected:
+                self._send(401, {'error': 'unauthorized'})
+                return
+        routes = {
+            '/api/v1/charts': mock._charts_payload,
+            '/api/v1/data': mock._data_payload,
+            '/api/v1/allmetrics': mock._allmetrics_payload,
+            '/api/v1/alarm_log': mock._alarm_log_payload,
+        }
+        if url.path == '/api/v1/charts' and mock.etags:
+            etag = mock._charts_etag()
+            if self.headers.get('If-None-Match') == etag:
+                mock._not_modified()
+                self._send(304, None, {'ETag': etag})
+            else:
+                self._send(200, mock._charts_payload(host, params), {'ETag': etag})
+            return
+        body = routes[url.path](host, params) if url.path in routes else None
+        if body is None:
+            self._send(404, {'error': 'not found'})
+        else:
+            self._send(200, body)
+
+
+
+# Cell
+
+
+class MockNetdata:
+    """A local stand-in for one or more netdata agents serving synthetic but deterministic data.
+
+    Each mock host is a small threaded http server on `127.0.0.1` serving `/api/v1/charts`, `/api/v1/data`,
+    `/api/v1/allmetrics` and `/api/v1/alarm_log`. Use it as a context manager and pass `mock.hosts` to any
+    of the functions in `netdata_pandas.data`.
+
+    ##### Parameters:
+    - **n_hosts** `int` Number of mock hosts to serve.
+    - **n_charts** `int` Number of charts each host has.
+    - **n_dims** `int` Number of dimensions each chart has.
+    - **window** `int` Number of seconds of history (retention) each host has.
+    - **update_every** `int` Number of seconds between each collected point.
+    - **latency** [`float`,`list`] Seconds of latency to inject into each response, a list gives a value per host.
+    - **n_alarms** `int` Number of entries to start the alarm log with.
+    - **user** `str` If set along with `pwd` then each request must use this basic auth username.
+    - **pwd** `str` If set along with `user` then each request must use this basic auth password.
+    - **etags** `bool` True to send an `ETag` with `/api/v1/charts` and answer a matching `If-None-Match` with a 304.
+
+    Every request is recorded in `request_log` as a `(host, path, params)` tuple, the distinct client connections
+    seen by each host in `connections` and the peak number of concurrent requests in `max_in_flight` (per host)
+    and `max_in_flight_total`, and the number of 304 responses in `not_modified`.
+
+    """
+
+    families = ['system', 'disk', 'net', 'apps', 'cgroup']
+
+    def __init__(self, n_hosts: int = 1, n_charts: int = 10, n_dims: int = 4, window: int = 3600,
+                 update_every: int = 1, latency=0.0, n_alarms: int = 10, user: str = None, pwd: str = None,
+                 etags: bool = True):
+        self.n_hosts = n_hosts
+        self.n_charts = n_charts
+        self.n_dims = n_dims
+        self.window = window
+        self.update_every = update_every
+        self.latency = latency
+        self.user = user
+        self.pwd = pwd
+        self.etags = etags
+        self.charts = [f'{self.families[i % len(self.families)]}.chart{i}' for i in range(n_charts)]
+        self.hosts = []
+        self.request_log = []
+        self.connections = {}
+        self.max_in_flight = {}
+        self.max_in_flight_total = 0
+        self.not_modified = 0
+        self._in_flight = {}
+        self._chart_idx = {chart: i for i, chart in enumerate(self.charts)}
+        self._host_idx = {}
+        self._servers = []
+        self._lock = threading.Lock()
+        self._alarms = []
+        self.add_alarms(n_alarms)
+
+    def start(self):
+        """Start a server for each mock host, `self.hosts` will then hold each `ip:port`."""
+        for i in range(self.n_hosts):
+            server = _MockServer(('127.0.0.1', 0), _MockHandler)
+            host = f'127.0.0.1:{server.server_address[1]}'
+            server.mock, server.host = self, host
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            self._host_idx[host] = i
+            self.connections[host], self.max_in_flight[host], self._in_flight[host] = set(), 0, 0
+            self.hosts.append(host)
+            self._servers.append(server)
+        return self
+
+    def stop(self):
+        """Shutdown all mock hosts."""
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        self._servers, self.hosts, self._host_idx = [], [], {}
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def dimensions(self, chart: str) -> list:
+        """List of dimension names for `chart`."""
+        return [f'dim{j}' for j in range(self.n_dims)]
+
+    def values(self, chart: str, times, host: str = None) -> np.ndarray:
+        """The synthetic values of `chart` on `host` for each timestamp in `times` as a (times, dims) array.
+
+        Values are a deterministic function of host, chart, dimension and time so overlapping requests always agree.
+        Some dimensions are always zero so there is something for the wrangle functions to drop.
+        """
+        i, h = self._chart_idx[chart], self._host_idx.get(host, 0)
+        t = np.asarray(times, dtype='float64')[:, None]
+        j = np.arange(self.n_dims)
+        values = np.round(50 + 40 * np.sin(t / (5.0 + j[None, :]) + i + h), 2)
+        values[:, (i + j) % 5 == 4] = 0.0
+        return values
+
+    def add_alarms(self, n: int = 1):
+        """Append `n` new entries to the alarm log of every host."""
+        with self._lock:
+            for _ in range(n):
+                k = len(self._alarms)
+                when = int(time.time())
+                chart = self.charts[k % len(self.charts)] if self.charts else 'system.cpu'
+                status, old_status = ('WARNING', 'CLEAR') if k % 2 == 0 else ('CLEAR', 'WARNING')
+                self._alarms.append({
+                    'hostname': None, 'unique_id': 1000 + k, 'alarm_id': k % 7, 'alarm_event_id': k + 1,
+                    'name': f'alarm{k % 7}', 'chart': chart, 'family': chart.split('.')[0], 'processed': True,
+                    'updated': False, 'exec_run': when, 'exec_failed': False, 'exec': 'alarm-notify.sh',
+                    'recipient': 'sysadmin', 'exec_code': 0, 'source': 'mock', 'units': '%', 'when': when,
+                    'duration': 10, 'non_clear_duration': 10, 'status': status, 'old_status': old_status,
+                    'delay': 0, 'delay_up_to_timestamp': when, 'updated_by_id': 0, 'updates_id': 0,
+                    'value_string': f'{k}%', 'old_value_string': f'{k + 1}%', 'last_repeat': 0,
+                    'silenced': 'false', 'info': f'mock alarm {k}', 'value': float(k), 'old_value': float(k + 1),
+                    'no_clear_notification': False
+                })
+
+    def _record(self, host: str, path: str, params: dict, client_address: tuple):
+        with self._lock:
+            self.request_log.append((host, path, params))
+            self.connections[host].add(client_address)
+            self._in_flight[host] += 1
+            self.max_in_flight[host] = max(self.max_in_flight[host], self._in_flight[host])
+            self.max_in_flight_total = max(self.max_in_flight_total, sum(self._in_flight.values()))
+
+    def _done(self, host: str):
+        with self._lock:
+            self._in_flight[host] -= 1
+
+    def _not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def _charts_etag(self) -> str:
+        """An etag for the chart metadata, which only changes if the charts, their dimensions or `update_every` do."""
+        charts = {chart: self.dimensions(chart) for chart in self.charts}
+        return '"' + hashlib.sha1(json.dumps([charts, self.update_every]).encode('utf-8')).hexdigest() + '"'
+
+    def _host_latency(self, host: str) -> float:
+        if isinstance(self.latency, (list, tuple)):
+            return self.latency[self._host_idx.get(host, 0) % len(self.latency)]
+        return self.latency
+
+    def _charts_payload(self, host: str, params: dict) -> dict:
+        now = int(time.time())
+        charts = {}
+        for chart in self.charts:
+            charts[chart] = {
+                'id': chart, 'name': chart, 'type': chart.split('.')[0], 'family': chart.split('.')[0],
+                'context': chart, 'title': chart, 'units': 'value', 'update_every': self.update_every,
+                'first_entry': now - self.window, 'last_entry': now,
+                'dimensions': {dim: {'name': dim} for dim in self.dimensions(chart)}
+            }
+        return {'hostname': host, 'version': 'mock', 'update_every': self.update_every, 'history': self.window,
+                'charts_count': len(charts), 'charts': charts}
+
+    def _data_payload(self, host: str, params: dict) -> dict:
+        chart = params.get('chart')
+        if chart not in self._chart_idx:
+            return None
+        now, ue = int(time.time()), self.update_every
+        after, before = _resolve_window(int(params.get('after', -600)), int(params.get('before', 0)), now)
+        after, before = max(after, now - self.window), min(before, now)
+        times = np.arange((after // ue + 1) * ue, before // ue * ue + 1, ue)
+        values = self.values(chart, times, host)
+        dims = self.dimensions(chart)
+        if params.get('dimensions'):
+            wanted = set(params['dimensions'].replace(',', '|').split('|'))
+            keep = [j for j, dim in enumerate(dims) if dim in wanted]
+            dims, values = [dims[j] for j in keep], values[:, keep]
+        points = int(params.get('points', 0))
+        if 0 < points < len(times):
+            size = -(-len(times) // points)
+            funcs = {'min': np.min, 'max': np.max, 'sum': np.sum, 'median': np.median,
+                     'stddev': lambda x, axis: np.std(x, axis=axis, ddof=1)}
+            func = funcs.get(params.get('group', 'average'), np.mean)
+            starts = range(0, len(times), size)
+            values = np.array([func(values[s:s + size], axis=0) for s in starts]).reshape(-1, len(dims))
+            times = np.array([times[min(s + size, len(times)) - 1] for s in starts], dtype=times.dtype)
+        options = set(params.get('options', '').replace(',', '|').split('|'))
+        if options & {'abs', 'absolute'}:
+            values = np.abs(values)
+        if 'nonzero' in options and len(times):
+            keep = [j for j in range(len(dims)) if np.any(values[:, j] != 0)]
+            dims, values = [dims[j] for j in keep], values[:, keep]
+        if 'flip' not in options:
+            times, values = times[::-1], values[::-1]
+        data = [[int(t)] + row for t, row in zip(times.tolist(), values.tolist())]
+        return {'api': 1, 'id': chart, 'name': chart, 'update_every': ue, 'view_update_every': ue,
+                'first_entry': now - self.window, 'last_entry': now,
+                'after': int(times.min()) if len(times) else after, 'before': int(times.max()) if len(times) else before,
+                'dimension_names': dims, 'dimension_ids': dims, 'labels': ['time'] + dims, 'data': data}
+
+    def _allmetrics_payload(self, host: str, params: dict) -> dict:
+        now = int(time.time())
+        payload = {}
+        for chart in self.charts:
+            dims = self.dimensions(chart)
+            values = self.values(chart, [now], host)[0]
+            payload[chart] = {
+                'name': chart, 'family': chart.split('.')[0], 'context': chart, 'units': 'value',
+                'last_updated': now,
+                'dimensions': {dim: {'name': dim, 'value': value} for dim, value in zip(dims, values.tolist())}
+            }
+        return payload
+
+    def _alarm_log_payload(self, host: str, params: dict) -> list:
+        after = int(params.get('after', 0))
+        with self._lock:
+            entries = [dict(alarm, hostname=host) for alarm in self._alarms if alarm['unique_id'] > after]
+        return entries[::-1]
+
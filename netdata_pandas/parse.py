@@ -0,0 +1,108 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: 08_parse.ipynb (unless otherwise specified).
+
+__all__ = ['parse_chart', 'chart_columns', 'chart_frame', 'parse_allmetrics']
+
+# Cell
+# export
+import json
+import numpy as np
+import pandas as pd
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# Cell
+
+
+def parse_chart(content: bytes, float_size: str = 'float64') -> tuple:
+    """Parse the raw content of a `format=json` `/api/v1/data` response into arrays.
+
+    Dimensions that are null for every row are dropped, as `numeric_only` does on the dataframe path.
+
+    ##### Parameters:
+    - **content** `bytes` The raw content of the response.
+    - **float_size** `str` float size to use if would like to save some memory, eg can use 'float32' or 'float16'.
+
+    ##### Returns:
+    - **(times, values, labels)** `tuple` The int64 timestamp of each row, a 2d (rows, dimensions) array of values
+    and the name of each dimension. None if the response is empty or not purely numeric.
+
+    """
+    r_json = _loads(content)
+    labels, rows = r_json['labels'][1:], r_json['data']
+    if not rows:
+        return None
+    try:
+        data = np.array(rows, dtype='float64')
+    except (ValueError, TypeError):
+        return None
+    if data.ndim != 2 or data.shape[1] != len(labels) + 1:
+        return None
+    times, values = data[:, 0].astype('int64'), data[:, 1:]
+    keep = ~np.isnan(values).all(axis=0)
+    if not keep.all():
+        values, labels = values[:, keep], [label for label, k in zip(labels, keep) if k]
+    return times, values.astype(float_size, copy=False), labels
+
+
+def chart_columns(labels: list, chart: str, host: str, col_sep: str = '|', host_prefix: bool = False,
+                  host_sep: str = ':') -> list:
+    """The dataframe column name of each dimension in `labels`."""
+    prefix = f'{host}{host_sep}{chart}{col_sep}' if host_prefix else f'{chart}{col_sep}'
+    return [f'{prefix}{label}' for label in labels]
+
+
+def chart_frame(parsed: tuple, chart: str, host: str, col_sep: str = '|', host_prefix: bool = False,
+                host_sep: str = ':') -> pd.DataFrame:
+    """Wrap the arrays from `parse_chart` in a dataframe laid out as `get_chart` returns them.
+
+    ##### Parameters:
+    - **parsed** `tuple` The (times, values, labels) returned from `parse_chart`.
+    - **chart** `str` The chart the data is for.
+    - **host** `str` The host the data is from.
+    - **col_sep** `str` A character for separating chart and dimension in column names of dataframe.
+    - **host_prefix** `bool` True to prefix each colname with the corresponding host.
+    - **host_sep** `str` A character for separating host and chart and dimensions in column names of dataframe.
+
+    ##### Returns:
+    - **df** `pd.DataFrame` A dataframe of the chart data.
+
+    """
+    times, values, labels = parsed
+    if host_prefix:
+        index = pd.Index(times, name='time_idx')
+    else:
+        index = pd.MultiIndex.from_arrays([np.full(len(times), host, dtype=object), times], names=['host', 'time_idx'])
+    columns = chart_columns(labels, chart, host, col_sep, host_prefix, host_sep)
+    df = pd.DataFrame(values, index=index, columns=columns, copy=False)
+    return df
+
+
+
+# Cell
+
+
+def parse_allmetrics(content: bytes, charts: list = None) -> tuple:
+    """Parse the raw content of a `format=json` `/api/v1/allmetrics` response into the latest value of each dimension.
+
+    ##### Parameters:
+    - **content** `bytes` The raw content of the response.
+    - **charts** `list` The charts to keep, all if None.
+
+    ##### Returns:
+    - **(keys, values)** `tuple` A list of (chart, dimension name) tuples and a float64 array of their values.
+
+    """
+    raw_data = _loads(content)
+    charts = set(charts) if charts is not None else None
+    keys, values = [], []
+    for chart, chart_data in raw_data.items():
+        if charts is not None and chart not in charts:
+            continue
+        for dimension in chart_data['dimensions'].values():
+            keys.append((chart, dimension['name']))
+            values.append(dimension['value'])
+    return keys, np.array(values, dtype='float64')
+
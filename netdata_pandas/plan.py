@@ -0,0 +1,137 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: 10_plan.ipynb (unless otherwise specified).
+
+__all__ = ['resolve_window', 'plan_chunks', 'data_options', 'resample_points', 'data_query']
+
+# Cell
+# export
+import time
+from urllib.parse import quote
+
+# Cell
+
+
+_API_RELATIVE_TIME_MAX = 3 * 365 * 86400
+
+
+def resolve_window(after: int, before: int, now: int = None) -> tuple:
+    """Resolve the netdata style (possibly relative) `after` and `before` into absolute timestamps.
+
+    ##### Parameters:
+    - **after** `int` The timestamp or relative integer from which to pull data after.
+    - **before** `int` The timestamp or relative integer from which to pull data before.
+    - **now** `int` The timestamp relative times are relative to, the current time if None.
+
+    ##### Returns:
+    - **(after, before)** `tuple` The absolute `after` and `before` timestamps.
+
+    """
+    now = int(time.time()) if now is None else now
+    if abs(before) <= _API_RELATIVE_TIME_MAX:
+        before = now + before
+    if abs(after) <= _API_RELATIVE_TIME_MAX:
+        after = before + after
+    return after, before
+
+
+def plan_chunks(after: int, before: int, chunk_size=None, update_every: int = 1, first_entry: int = None,
+                points_per_chunk: int = 3600, now: int = None) -> list:
+    """Split the `(after, before]` window of a raw (`points=0`) request into consecutive chunks.
+
+    ##### Parameters:
+    - **after** `int` The timestamp or relative integer from which to pull data after.
+    - **before** `int` The timestamp or relative integer from which to pull data before.
+    - **chunk_size** [`int`,`str`] Seconds of data per chunk, 'auto' for `points_per_chunk` points of `update_every` or None for one chunk.
+    - **update_every** `int` Number of seconds between each point of the chart, chunks are a multiple of this.
+    - **first_entry** `int` The oldest timestamp the agent has data for, no chunks are planned before it.
+    - **points_per_chunk** `int` Number of points per chunk when `chunk_size` is 'auto'.
+    - **now** `int` The timestamp relative times are relative to, the current time if None.
+
+    ##### Returns:
+    - **chunks** `list` A list of absolute (after, before) tuples in time order.
+
+    """
+    after, before = resolve_window(after, before, now)
+    if first_entry:
+        after = max(after, first_entry - update_every)
+    if after >= before:
+        return []
+    if chunk_size == 'auto':
+        chunk_size = update_every * points_per_chunk
+    if not chunk_size:
+        return [(after, before)]
+    chunk_size = max(update_every, chunk_size // update_every * update_every)
+    return [(start, min(start + chunk_size, before)) for start in range(after, before, chunk_size)]
+
+
+
+# Cell
+
+
+_UNSUPPORTED_OPTIONS = {'jsonwrap', 'objectrows', 'google_json', 'milliseconds', 'ms'}
+
+
+def data_options(options=None) -> list:
+    """Check and normalise the netdata `options` of a `/api/v1/data` call.
+
+    ##### Parameters:
+    - **options** [`list`,`str`] A list of options, or a string of them separated by '|' or ','.
+
+    ##### Returns:
+    - **options** `list` The options as a list, without duplicates.
+
+    """
+    if isinstance(options, str):
+        options = options.replace(',', '|').split('|')
+    options = list(dict.fromkeys(option for option in options or [] if option))
+    unsupported = sorted(set(options) & _UNSUPPORTED_OPTIONS)
+    if unsupported:
+        raise ValueError(f'The options {unsupported} change the format of the response so can not be used.')
+    return options
+
+
+def resample_points(after: int, before: int, resample: int, now: int = None) -> tuple:
+    """Resolve the window and work out the `points` that group it into one point per `resample` seconds.
+
+    ##### Parameters:
+    - **after** `int` The timestamp or relative integer from which to pull data after.
+    - **before** `int` The timestamp or relative integer from which to pull data before.
+    - **resample** `int` Number of seconds per point.
+    - **now** `int` The timestamp relative times are relative to, the current time if None.
+
+    ##### Returns:
+    - **(after, before, points)** `tuple` The absolute `after` and `before` timestamps and the `points` to ask for.
+
+    """
+    after, before = resolve_window(after, before, now)
+    return after, before, max(1, -(-(before - after) // resample))
+
+
+def data_query(chart: str, after: int, before: int, points: int = 0, group: str = 'average', dimensions: list = None,
+               options: list = None, gtime: int = None) -> str:
+    """The query string of a `/api/v1/data` call, with any dimension selection and reduction pushed down to the agent.
+
+    ##### Parameters:
+    - **chart** `str` The chart to get data for.
+    - **after** `int` The timestamp or relative integer from which to pull data after.
+    - **before** `int` The timestamp or relative integer from which to pull data before.
+    - **points** `int` The number of points to group the window into, 0 for every point.
+    - **group** `str` The grouping function the agent uses when `points` is set.
+    - **dimensions** `list` The dimensions to return, all if None.
+    - **options** [`list`,`str`] The netdata options to pass on, eg ['nonzero', 'abs'].
+    - **gtime** `int` The netdata `gtime`, the number of seconds averages are reported per.
+
+    ##### Returns:
+    - **query** `str` The query string, without the leading '?'.
+
+    """
+    query = f'chart={chart}&after={after}&before={before}&points={points}&format=json&group={group}'
+    if dimensions:
+        dimensions = [dimensions] if isinstance(dimensions, str) else dimensions
+        query += '&dimensions=' + quote('|'.join(dimensions), safe='')
+    options = data_options(options)
+    if options:
+        query += '&options=' + quote('|'.join(options), safe='')
+    if gtime:
+        query += f'&gtime={gtime}'
+    return query
+
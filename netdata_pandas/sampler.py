@@ -0,0 +1,139 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: 12_sampler.ipynb (unless otherwise specified).
+
+__all__ = ['AllMetricsSampler']
+
+# Cell
+# export
+import time
+import anyio
+import numpy as np
+import pandas as pd
+import trio
+from .buffer import RingBuffer
+from .fetch import Fetcher, FetchError
+from .parse import parse_allmetrics, chart_columns
+
+# Cell
+
+
+class AllMetricsSampler:
+    """Sample the latest value of every dimension of `charts` on `hosts` every `every` seconds.
+
+    ##### Parameters:
+    - **hosts** `list` A list of hosts to sample.
+    - **charts** `list` A list of charts to sample, all if None.
+    - **capacity** `int` Number of samples to keep.
+    - **every** `float` Number of seconds between each sample.
+    - **col_sep** `str` A character for separating chart and dimension in column names of dataframe.
+    - **host_prefix** `bool` True to prefix each colname with the corresponding host, defaults to True if more than one host.
+    - **host_sep** `str` A character for separating host and chart and dimensions in column names of dataframe.
+    - **float_size** `str` float size to use if would like to save some memory, eg can use 'float32' or 'float16'.
+    - **timeout** `int` Number of seconds to wait for each sample before moving on without the hosts that have not answered.
+    - **user** `str` A username to use if netdata is password protected.
+    - **pwd** `str` A password to use if netdata is password protected.
+    - **protocol** `str` 'http' or 'https'.
+    - **max_connections** `int` Max number of requests in flight across all hosts.
+    - **max_connections_per_host** `int` Max number of requests in flight (and size of connection pool) for each host.
+
+    """
+
+    def __init__(self, hosts: list = ['127.0.0.1:19999'], charts: list = None, capacity: int = 600, every: float = 1,
+                 col_sep: str = '|', host_prefix: bool = None, host_sep: str = ':', float_size: str = 'float64',
+                 timeout: int = 10, user: str = None, pwd: str = None, protocol: str = 'http',
+                 max_connections: int = 100, max_connections_per_host: int = 8):
+        if isinstance(hosts, str):
+            hosts = [hosts]
+        self.hosts = hosts
+        self.charts = charts
+        self.every = every
+        self.col_sep, self.host_sep = col_sep, host_sep
+        self.host_prefix = len(hosts) > 1 if host_prefix is None else host_prefix
+        self.timeout = timeout
+        self.user, self.pwd, self.protocol = user, pwd, protocol
+        self.max_connections, self.max_connections_per_host = max_connections, max_connections_per_host
+        self.buffer = RingBuffer(capacity, dtype=float_size)
+        self.missing = []
+        self._keys = {}
+        self._columns = {}
+        self._idx = {}
+
+    def _add_columns(self, host: str, keys: list):
+        """Add a column for each (chart, dimension) in `keys` to the buffer, only worked out again if `keys` changed."""
+        if self._keys.get(host) != keys:
+            self._columns[host] = [
+                chart_columns([dim], chart, host, self.col_sep, self.host_prefix, self.host_sep)[0] for chart, dim in keys
+            ]
+            self._keys[host] = keys
+            self.buffer.add_columns(self._columns[host])
+            self._idx.pop(host, None)
+
+    def _positions(self, host: str) -> np.ndarray:
+        """The buffer position of each of `host`'s columns, only worked out again if the buffer's columns changed."""
+        n_columns = len(self.buffer.columns)
+        if host not in self._idx or self._idx[host][0] != n_columns:
+            # adding another host's columns can move this host's columns along
+            self._idx[host] = (n_columns, self.buffer.add_columns(self._columns[host]))
+        return self._idx[host][1]
+
+    async def _sample(self, fetcher: Fetcher):
+        """Take one sample of every host and append it as a row."""
+        sample_time = int(time.time())
+        results = {}
+
+        async def fetch(host):
+            url = f'{self.protocol}://{host}/api/v1/allmetrics?format=json'
+            try:
+                r = await fetcher.get(url, self.user, self.pwd)
+            except FetchError:
+                return
+            results[host] = parse_allmetrics(r.content, self.charts)
+
+        async with anyio.move_on_after(self.timeout):
+            async with anyio.create_task_group() as tg:
+                for host in self.hosts:
+                    await tg.spawn(fetch, host)
+        self.missing = [host for host in self.hosts if host not in results]
+        hosts = [host for host in self.hosts if host in results]
+        if not hosts:
+            return
+        for host in hosts:
+            self._add_columns(host, results[host][0])
+        idx = np.concatenate([self._positions(host) for host in hosts])
+        values = np.concatenate([results[host][1] for host in hosts])
+        self.buffer.append([sample_time], values[None, :], idx=idx)
+
+    async def arun(self, n_samples: int = None, duration: float = None):
+        """Sample every `every` seconds until `n_samples` samples have been taken or `duration` seconds have passed.
+
+        Runs forever if both are None, use within a trio or asyncio task group (or cancel scope) to sample in the background.
+        """
+        start = time.monotonic()
+        n = 0
+        async with Fetcher(self.max_connections, self.max_connections_per_host) as fetcher:
+            while n_samples is None or n < n_samples:
+                if n:
+                    # skip any ticks missed while sampling rather than trying to catch up
+                    ticks = int((time.monotonic() - start) // self.every) + 1
+                    await anyio.sleep(max(0, start + ticks * self.every - time.monotonic()))
+                if duration is not None and time.monotonic() - start >= duration:
+                    break
+                await self._sample(fetcher)
+                n += 1
+
+    def run(self, n_samples: int = None, duration: float = None) -> pd.DataFrame:
+        """Sample until `n_samples` samples have been taken or `duration` seconds have passed.
+
+        ##### Returns:
+        - **df** `pd.DataFrame` A view of the rolling window of samples.
+
+        """
+        trio.run(self.arun, n_samples, duration)
+        return self.to_frame()
+
+    def to_frame(self, n: int = None, copy: bool = False) -> pd.DataFrame:
+        """The latest `n` samples (all if None) as a dataframe.
+
+        Unless `copy` is True the dataframe is a view onto the underlying `RingBuffer`.
+        """
+        return self.buffer.to_frame(n, copy=copy)
+
@@ -0,0 +1,116 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: 13_shard.ipynb (unless otherwise specified).
+
+__all__ = ['get_charts_sharded']
+
+# Cell
+# export
+import os
+import signal
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from .assemble import GridBuffer
+from .fetch import FetchError
+
+# Cell
+
+
+def _shard(api_calls: list, n: int) -> list:
+    """Split `api_calls` into at most `n` shards of about the same size, keeping calls for the same host together where possible."""
+    api_calls = sorted(api_calls, key=lambda api_call: api_call[2])
+    size = -(-len(api_calls) // n)
+    return [api_calls[i:i + size] for i in range(0, len(api_calls), size)]
+
+
+def _shm_dir() -> str:
+    return '/dev/shm' if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK) else tempfile.gettempdir()
+
+
+def _fetch_shard(api_calls: list, col_sep: str, timeout: int, float_size: str, host_prefix: bool, host_sep: str,
+                 max_connections: int, max_connections_per_host: int) -> tuple:
+    """Fetch and assemble one shard in a worker process, returning where its values were saved along with their labels and what is missing."""
+    import trio
+    # imported here as data imports this module
+    from .data import get_charts
+    # a worker forked from within a running event loop inherits its signal wakeup fd
+    signal.set_wakeup_fd(-1)
+    assembler = GridBuffer(float_size, host_prefix)
+    try:
+        df = trio.run(get_charts, api_calls, col_sep, timeout, True, float_size, host_prefix, host_sep, max_connections,
+                      max_connections_per_host, None, assembler)
+    except FetchError:
+        # nothing in the shard could be fetched, leave it to the other shards
+        return None, [], None, [], sorted(set((host, chart) for _, chart, host, _, _ in api_calls))
+    fd, path = tempfile.mkstemp(prefix='netdata_pandas_', suffix='.npy', dir=_shm_dir())
+    with os.fdopen(fd, 'wb') as f:
+        np.save(f, df.values)
+    if host_prefix:
+        hosts = [(None, 0, len(df))]
+    else:
+        # rows are sorted by host so each host is one contiguous slice
+        row_hosts = df.index.get_level_values('host').values
+        hosts, starts = np.unique(row_hosts, return_index=True)
+        ends = list(starts[1:]) + [len(df)]
+        hosts = [(host, int(start), int(end)) for host, start, end in zip(hosts, starts, ends)]
+    return path, hosts, df.index.get_level_values('time_idx').values, list(df.columns), df.attrs.get('missing', [])
+
+
+
+# Cell
+
+
+def get_charts_sharded(api_calls: list, col_sep: str = '|', timeout: int = 60, float_size: str = 'float64',
+                       host_prefix: bool = False, host_sep: str = ':', max_connections: int = 100,
+                       max_connections_per_host: int = 8, processes: int = None, assembler=None) -> pd.DataFrame:
+    """Fetch the numeric data of `api_calls` across a pool of worker processes and assemble it into one time grid.
+
+    ##### Parameters:
+    - **api_calls** `list` A list of tuple's of [(`url`,`chart`),...] of api calls that need to be made.
+    - **col_sep** `str` A character for separating chart and dimension in column names of dataframe.
+    - **timeout** `int` The number of seconds for trio to [move_on_after](https://trio.readthedocs.io/en/stable/reference-core.html#trio.move_on_after).
+    - **float_size** `str` float size to use if would like to save some memory, eg can use 'float32' or 'float16'.
+    - **host_prefix** `bool` True to prefix each colname with the corresponding host.
+    - **host_sep** `str` A character for separating host and chart and dimensions in column names of dataframe.
+    - **max_connections** `int` Max number of requests in flight across all hosts, split evenly between the processes.
+    - **max_connections_per_host** `int` Max number of requests in flight (and size of connection pool) for each host in each process.
+    - **processes** `int` Number of worker processes, the number of cpus if None.
+    - **assembler** `GridBuffer` The `GridBuffer` to assemble the result with, a new one is used if None.
+
+    ##### Returns:
+    - **df** `pd.DataFrame` A pandas dataframe with all chart data assembled on a (host, time) grid.
+
+    """
+    processes = processes or os.cpu_count() or 1
+    assembler = assembler or GridBuffer(float_size, host_prefix)
+    shards = _shard(api_calls, processes)
+    shard_connections = max(1, max_connections // max(1, len(shards)))
+    with ProcessPoolExecutor(max_workers=len(shards) or 1) as executor:
+        futures = [
+            executor.submit(_fetch_shard, shard, col_sep, timeout, float_size, host_prefix, host_sep,
+                            shard_connections, max_connections_per_host)
+            for shard in shards
+        ]
+    # every shard that fetched something left a file behind, even if another one failed
+    paths = [future.result()[0] for future in futures if future.exception() is None and future.result()[0]]
+    try:
+        missing = []
+        for future in futures:
+            path, hosts, times, columns, shard_missing = future.result()
+            missing += shard_missing
+            if path is None:
+                continue
+            values = np.load(path, mmap_mode='r')
+            for host, start, end in hosts:
+                assembler.add(host, times[start:end], values[start:end], columns)
+        if shards and not paths:
+            raise FetchError(f'None of the {len(api_calls)} api calls could be fetched.')
+        df = assembler.to_frame()
+    finally:
+        for path in paths:
+            os.remove(path)
+    attrs = getattr(df, 'attrs', None)
+    if attrs is not None:
+        attrs['missing'] = sorted(set(missing))
+    return df
+
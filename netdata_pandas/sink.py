@@ -0,0 +1,248 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: 14_sink.ipynb (unless otherwise specified).
+
+__all__ = ['Sink', 'CallbackSink', 'ParquetSink', 'FeatherSink', 'SinkReader']
+
+# Cell
+# export
+import json
+import os
+from urllib.parse import quote
+import numpy as np
+import pandas as pd
+from .assemble import GridBuffer
+
+# Cell
+
+
+class Sink:
+    """Base class of sinks that are handed the data of each chart as it arrives, in place of a `GridBuffer`.
+
+    Subclasses implement `write(host, df)` and, if there is something to return once the pull is done, `to_frame()`.
+    """
+
+    def __init__(self):
+        self.process = None
+        self.by_time = False
+        self.n_chunks = {}
+        self.chart_of = None
+        self._chunks = {}
+
+    def start(self, process=None, by_time: bool = False, n_chunks: dict = None, chart_of=None):
+        """Get ready for a new pull.
+
+        ##### Parameters:
+        - **process** `callable` A function applied to each block before it is written, eg the `get_data` post processing.
+        - **by_time** `bool` True if rows are just indexed by time, ie columns are prefixed with their host or there is one host.
+        - **n_chunks** `dict` The number of chunks each (host, chart) is fetched in, if more than one.
+        - **chart_of** `callable` A function of (host, column) giving the chart a column is from, needed with `n_chunks`.
+
+        """
+        self.process = process
+        self.by_time = by_time
+        self.n_chunks = n_chunks or {}
+        self.chart_of = chart_of
+        self._chunks = {}
+
+    def add(self, host: str, times, values, columns: list):
+        """Process a block of data and write it, taking the same arguments as `GridBuffer.add`.
+
+        A chunk of a chart in `n_chunks` is held until the rest of the chart's chunks have arrived.
+        """
+        df = pd.DataFrame(
+            np.asarray(values), index=pd.Index(np.asarray(times, dtype='int64'), name='time_idx'), columns=list(columns)
+        )
+        key = (host, self.chart_of(host, df.columns[0])) if self.n_chunks and len(df.columns) else None
+        if key in self.n_chunks:
+            chunks = self._chunks.setdefault(key, [])
+            chunks.append(df)
+            if len(chunks) < self.n_chunks[key]:
+                return
+            df = self._join(self._chunks.pop(key))
+        self._process(host, df)
+
+    def _join(self, chunks: list) -> pd.DataFrame:
+        """Join the chunks of a chart, keeping one of any points where chunks overlap."""
+        df = pd.concat(chunks, join='outer', axis=0, sort=False)
+        return df[~df.index.duplicated(keep='last')].sort_index()
+
+    def _process(self, host: str, df: pd.DataFrame):
+        if self.process is not None:
+            df = self.process(df)
+        if len(df.columns):
+            self.write(host, df)
+
+    def flush(self):
+        """Process and write the chunks still held, eg of charts where a chunk could not be fetched."""
+        for (host, chart), chunks in list(self._chunks.items()):
+            del self._chunks[(host, chart)]
+            self._process(host, self._join(chunks))
+
+    def write(self, host: str, df: pd.DataFrame):
+        raise NotImplementedError
+
+    def to_frame(self):
+        """Finish the pull, called where `GridBuffer.to_frame` would be."""
+        self.flush()
+        return None
+
+
+class CallbackSink(Sink):
+    """A sink that calls `callback(host, df)` with each block of data.
+
+    ##### Parameters:
+    - **callback** `callable` A function to call with the host and dataframe of each block.
+
+    """
+
+    def __init__(self, callback):
+        super().__init__()
+        self.callback = callback
+
+    def write(self, host: str, df: pd.DataFrame):
+        self.callback(host, df)
+
+
+
+# Cell
+
+
+class _FileSink(Sink):
+    """A sink that writes each block to its own file under `path`, partitioned by host."""
+
+    ext = None
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = os.path.expanduser(path)
+        self.parts = []
+        self.float_size = None
+
+    def start(self, process=None, by_time: bool = False, n_chunks: dict = None, chart_of=None):
+        super().start(process, by_time, n_chunks, chart_of)
+        self.parts = []
+        os.makedirs(self.path, exist_ok=True)
+
+    def _write(self, df: pd.DataFrame, path: str):
+        raise NotImplementedError
+
+    def write(self, host: str, df: pd.DataFrame):
+        part = os.path.join(f'host={quote(host, safe="")}', f'part-{len(self.parts):05d}.{self.ext}')
+        os.makedirs(os.path.join(self.path, os.path.dirname(part)), exist_ok=True)
+        self._write(df.rename_axis('time_idx').reset_index(), os.path.join(self.path, part))
+        self.float_size = self.float_size or str(df.dtypes.iloc[0])
+        self.parts.append({'host': host, 'path': part, 'columns': list(df.columns)})
+
+    def to_frame(self):
+        """Write the manifest of the parts written and return a `SinkReader` onto them."""
+        self.flush()
+        manifest = {'format': self.ext, 'by_time': self.by_time, 'float_size': self.float_size, 'parts': self.parts}
+        with open(os.path.join(self.path, '_sink.json'), 'w') as f:
+            json.dump(manifest, f)
+        return SinkReader(self.path)
+
+
+class ParquetSink(_FileSink):
+    """A sink that writes each block to a parquet file under `path`, partitioned by host.
+
+    ##### Parameters:
+    - **path** `str` The directory to write the dataset to.
+    - **compression** `str` The parquet compression codec to use.
+
+    """
+
+    ext = 'parquet'
+
+    def __init__(self, path: str, compression: str = 'snappy'):
+        super().__init__(path)
+        self.compression = compression
+
+    def _write(self, df: pd.DataFrame, path: str):
+        # parquet has no float16 type
+        if (df.dtypes == 'float16').any():
+            df = df.astype({col: 'float32' for col in df.columns[df.dtypes == 'float16']})
+        df.to_parquet(path, engine='pyarrow', compression=self.compression, index=False)
+
+
+class FeatherSink(_FileSink):
+    """A sink that writes each block to a Feather (Arrow IPC) file under `path`, partitioned by host.
+
+    ##### Parameters:
+    - **path** `str` The directory to write the files to.
+
+    """
+
+    ext = 'feather'
+
+    def _write(self, df: pd.DataFrame, path: str):
+        df.to_feather(path)
+
+
+
+# Cell
+
+
+class SinkReader:
+    """Lazily reopen the files written by a `ParquetSink` or `FeatherSink`, only reading the parts that are asked for.
+
+    ##### Parameters:
+    - **path** `str` The directory the sink wrote to.
+
+    """
+
+    def __init__(self, path: str):
+        self.path = os.path.expanduser(path)
+        with open(os.path.join(self.path, '_sink.json')) as f:
+            manifest = json.load(f)
+        self.format = manifest['format']
+        self.by_time = manifest['by_time']
+        self.float_size = manifest['float_size'] or 'float64'
+        self.parts = manifest['parts']
+
+    @property
+    def columns(self) -> list:
+        """All columns written, without reading any data."""
+        return sorted(set(col for part in self.parts for col in part['columns']))
+
+    @property
+    def hosts(self) -> list:
+        """All hosts written, without reading any data."""
+        return sorted(set(part['host'] for part in self.parts))
+
+    def _read(self, path: str, columns: list) -> pd.DataFrame:
+        if self.format == 'parquet':
+            return pd.read_parquet(path, engine='pyarrow', columns=columns)
+        return pd.read_feather(path, columns=columns)
+
+    def to_frame(self, columns: list = None, hosts: list = None) -> pd.DataFrame:
+        """Read the data back into one dataframe.
+
+        ##### Parameters:
+        - **columns** `list` The columns to read, all if None.
+        - **hosts** `list` The hosts to read, all if None.
+
+        ##### Returns:
+        - **df** `pd.DataFrame` A dataframe of the selected data, indexed as `get_data` would have.
+
+        """
+        assembler = GridBuffer(self.float_size, host_prefix=self.by_time)
+        as_datetime = False
+        for part in self.parts:
+            if hosts is not None and part['host'] not in hosts:
+                continue
+            cols = [col for col in part['columns'] if columns is None or col in columns]
+            if not cols:
+                continue
+            df = self._read(os.path.join(self.path, part['path']), ['time_idx'] + cols)
+            as_datetime = as_datetime or pd.api.types.is_datetime64_any_dtype(df['time_idx'])
+            assembler.add(part['host'], df['time_idx'].values.astype('int64'), df[cols].values, cols)
+        df = assembler.to_frame()
+        if as_datetime:
+            if self.by_time:
+                df.index = pd.DatetimeIndex(pd.to_datetime(df.index.values), name='time_idx')
+            else:
+                df.index = df.index.set_levels(pd.to_datetime(df.index.levels[1]), level=1)
+        return df.reindex(sorted(df.columns) if columns is None else [col for col in columns if col in df.columns], axis=1)
+
+    def __getitem__(self, columns) -> pd.DataFrame:
+        return self.to_frame([columns] if isinstance(columns, str) else list(columns))
+
@@ -0,0 +1,124 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: 15_stats.ipynb (unless otherwise specified).
+
+__all__ = ['Instrument', 'no_instrument']
+
+# Cell
+# export
+import asyncio
+import time
+import pandas as pd
+import trio
+
+# Cell
+
+
+_REQUEST_FIELDS = [
+    'url', 'host', 'chart', 'status', 'status_code', 'error', 'start', 'wait', 'transfer', 'parse', 'bytes', 'rows', 'columns'
+]
+_CANCELLED = (trio.Cancelled, asyncio.CancelledError)
+
+
+class _Timing:
+    """A context manager adding the seconds spent within it to `record[field]`."""
+
+    def __init__(self, record: dict = None, field: str = None, callback=None):
+        self.record, self.field, self.callback = record, field, callback
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        if self.record is not None:
+            self.record[self.field] = (self.record.get(self.field) or 0) + seconds
+        if self.callback is not None:
+            self.callback(seconds)
+
+
+class Instrument:
+    """Collect a record of each request and the time spent in each stage of a pull.
+
+    ##### Parameters:
+    - **hooks** `list` Functions to call with `(kind, record)` as each 'request' or 'stage' record is made.
+
+    """
+
+    def __init__(self, hooks: list = None):
+        self.hooks = list(hooks or [])
+        self.requests = []
+        self.stages = {}
+
+    def _emit(self, kind: str, record: dict):
+        for hook in self.hooks:
+            hook(kind, record)
+
+    def request(self, url: str, host: str = None, chart: str = None) -> dict:
+        """Start the record of a request to `url`."""
+        record = dict.fromkeys(_REQUEST_FIELDS)
+        record.update(url=url, host=host, chart=chart, status='pending', start=time.time())
+        return record
+
+    def timing(self, record: dict, field: str) -> _Timing:
+        """A context manager adding the seconds spent within it to `record[field]`."""
+        return _Timing(record, field)
+
+    def finish(self, record: dict, error: BaseException = None, **fields):
+        """Finish `record`, as 'ok' or, if there was an `error`, as 'timeout' if it was a cancellation or 'error' otherwise."""
+        record.update(fields)
+        if error is None:
+            record['status'] = 'ok'
+        elif isinstance(error, _CANCELLED):
+            record['status'] = 'timeout'
+        else:
+            record['status'], record['error'] = 'error', repr(error)
+        self.requests.append(record)
+        self._emit('request', record)
+
+    def stage(self, name: str) -> _Timing:
+        """A context manager adding the seconds spent within it to `stages[name]`."""
+
+        def done(seconds):
+            self.stages[name] = self.stages.get(name, 0) + seconds
+            self._emit('stage', {'stage': name, 'seconds': seconds})
+
+        return _Timing(callback=done)
+
+    @property
+    def missing(self) -> list:
+        """The records of requests that timed out or failed, so are missing from the result."""
+        return [record for record in self.requests if record['status'] != 'ok']
+
+    def to_frame(self) -> pd.DataFrame:
+        """All request records as a dataframe."""
+        return pd.DataFrame(self.requests, columns=_REQUEST_FIELDS)
+
+    def summary(self) -> pd.DataFrame:
+        """Per host totals of the request records, slowest hosts first."""
+        df = self.to_frame()
+        df['failed'] = df['status'] != 'ok'
+        df = df.groupby('host').agg(
+            requests=('url', 'count'), failed=('failed', 'sum'), bytes=('bytes', 'sum'), wait=('wait', 'sum'),
+            transfer=('transfer', 'sum'), max_transfer=('transfer', 'max'), parse=('parse', 'sum')
+        )
+        return df.sort_values('transfer', ascending=False)
+
+
+class _NoInstrument(Instrument):
+    """An `Instrument` that records nothing, used when none is given so instrumented code needs no checks."""
+
+    def request(self, url: str, host: str = None, chart: str = None) -> dict:
+        return None
+
+    def timing(self, record: dict, field: str) -> _Timing:
+        return _NO_TIMING
+
+    def finish(self, record: dict, error: BaseException = None, **fields):
+        pass
+
+    def stage(self, name: str) -> _Timing:
+        return _NO_TIMING
+
+
+_NO_TIMING = _Timing()
+no_instrument = _NoInstrument()
\ No newline at end of file
@@ -0,0 +1,200 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: 06_tail.ipynb (unless otherwise specified).
+
+__all__ = ['DataTail']
+
+# Cell
+# export
+import anyio
+import numpy as np
+import pandas as pd
+import trio
+from .buffer import RingBuffer
+from .data import get_chart
+from .fetch import Fetcher, FetchError
+from .wrangle import ColumnStats
+
+# Cell
+
+
+class DataTail:
+    """Follow `hosts` and `charts`, keeping a rolling window of the latest `window` rows.
+
+    ##### Parameters:
+    - **hosts** `list` A list of hosts to pull data from.
+    - **charts** `list` A list of charts to pull data for.
+    - **window** `int` Number of rows to keep in the rolling window.
+    - **after** `int` The relative integer to backfill from on the first poll, defaults to `-window`.
+    - **col_sep** `str` A character for separating chart and dimension in column names of dataframe.
+    - **ffill** `bool` Set to true if you want to forward fill any null or missing values.
+    - **diff** `bool` Set to true if you want to get the difference of metrics as opposed to their raw value.
+    - **timeout** `int` The number of seconds for trio to [move_on_after](https://trio.readthedocs.io/en/stable/reference-core.html#trio.move_on_after).
+    - **user** `str` A username to use if netdata is password protected.
+    - **pwd** `str` A password to use if netdata is password protected.
+    - **protocol** `str` 'http' or 'https'.
+    - **float_size** `str` float size to use if would like to save some memory, eg can use 'float32' or 'float16'.
+    - **host_charts_dict** `dict` dictionary of hosts to pull for where each value is list of relevant charts to pull from that host.
+    - **host_prefix** `bool` True to prefix each colname with the corresponding host, defaults to True if more than one host.
+    - **host_sep** `str` A character for separating host and chart and dimensions in column names of dataframe.
+    - **max_lag** `int` Number of seconds a chart can lag behind the newest chart before rows are appended without it.
+    - **max_connections** `int` Max number of requests in flight across all hosts.
+    - **max_connections_per_host** `int` Max number of requests in flight (and size of connection pool) for each host.
+    - **stats** `bool` True to keep `ColumnStats` of the rows in the window as `self.stats`.
+    - **fetcher** `Fetcher` A `Fetcher` to make requests with, if None one is created from the connection limits and kept for the life of the tail.
+
+    """
+
+    def __init__(self, hosts: list = ['127.0.0.1:19999'], charts: list = ['system.cpu'], window: int = 600,
+                 after: int = None, col_sep: str = '|', ffill: bool = True, diff: bool = False, timeout: int = 60,
+                 user: str = None, pwd: str = None, protocol: str = 'http', float_size: str = 'float64',
+                 host_charts_dict: dict = None, host_prefix: bool = None, host_sep: str = ':', max_lag: int = 5,
+                 max_connections: int = 100, max_connections_per_host: int = 8, stats: bool = False,
+                 fetcher: Fetcher = None):
+        if isinstance(hosts, str):
+            hosts = [hosts]
+        if host_charts_dict:
+            self.host_charts = [(k, v) for k in host_charts_dict for v in host_charts_dict[k]]
+        else:
+            self.host_charts = [(host, chart) for host in hosts for chart in charts]
+        n_hosts = len(set(host for host, _ in self.host_charts))
+        self.host_prefix = n_hosts > 1 if host_prefix is None else host_prefix
+        self.window = window
+        self.after = -window if after is None else after
+        self.col_sep, self.host_sep = col_sep, host_sep
+        self.ffill, self.diff = ffill, diff
+        self.timeout = timeout
+        self.user, self.pwd, self.protocol = user, pwd, protocol
+        self.float_size = float_size
+        self.max_lag = max_lag
+        self.max_connections, self.max_connections_per_host = max_connections, max_connections_per_host
+        # kept open between polls so each one reuses the connection pool, closed by `close`
+        self.fetcher = fetcher or Fetcher(max_connections, max_connections_per_host)
+        self._own_fetcher = fetcher is None
+        self.buffer = RingBuffer(window, dtype=float_size)
+        self.stats = ColumnStats() if stats else None
+        self.last_seen = {}
+        self.missing = []
+        self._pending = {}
+        self._last_filled = None
+        self._last_time = None
+
+    def _api_calls(self) -> list:
+        api_calls = []
+        for host, chart in self.host_charts:
+            after = self.last_seen.get((host, chart), self.after)
+            url = f'{self.protocol}://{host}/api/v1/data?chart={chart}&after={after}&before=0&points=0&format=json&group=average'
+            api_calls.append((url, chart, host, self.user, self.pwd))
+        return api_calls
+
+    async def _fetch(self) -> dict:
+        results = {host_chart: [] for host_chart in self.host_charts}
+        missing = []
+
+        async def fetch(api_call):
+            _, chart, host, _, _ = api_call
+            try:
+                await get_chart(api_call, results[(host, chart)], self.col_sep, True, self.float_size,
+                                self.host_prefix, self.host_sep, self.fetcher)
+            except FetchError:
+                missing.append((host, chart))
+
+        async with anyio.move_on_after(self.timeout):
+            async with anyio.create_task_group() as tg:
+                for api_call in self._api_calls():
+                    await tg.spawn(fetch, api_call)
+        self.missing = sorted(missing)
+        return results
+
+    def _ready(self) -> pd.DataFrame:
+        """Pop the pending rows every chart has now reported up to."""
+        if not self.last_seen:
+            return None
+        newest = max(self.last_seen.values())
+        watermark = min(max(self.last_seen.get(host_chart, newest), newest - self.max_lag) for host_chart in self.host_charts)
+        ready = []
+        for host_chart in list(self._pending):
+            df = self._pending[host_chart]
+            ready.append(df[df.index <= watermark])
+            if df.index.max() > watermark:
+                self._pending[host_chart] = df[df.index > watermark]
+            else:
+                del self._pending[host_chart]
+        ready = [df for df in ready if len(df)]
+        if not ready:
+            return None
+        df = pd.concat(ready, join='outer', axis=1, sort=True)
+        if self._last_time is not None:
+            df = df[df.index > self._last_time]
+        return df
+
+    def _process(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Apply ffill and diff to just the new rows, carrying state over from the previous poll."""
+        if self.ffill:
+            df = df.ffill()
+            if self._last_filled is not None:
+                df = df.fillna(self._last_filled.reindex(df.columns))
+        last_filled = df.iloc[-1]
+        if self._last_filled is not None:
+            last_filled = last_filled.combine_first(self._last_filled)
+        if self.diff:
+            previous = self._last_filled.reindex(df.columns).to_frame().T if self._last_filled is not None else df.iloc[:0]
+            df = pd.concat([previous, df]).diff().iloc[len(previous):].dropna(how='all')
+        self._last_filled = last_filled
+        return df
+
+    def close(self):
+        """Close the pooled connections, unless the `Fetcher` was passed in and so belongs to the caller."""
+        if self._own_fetcher:
+            trio.run(self.fetcher.aclose)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def update(self) -> pd.DataFrame:
+        """Poll each chart for points newer than those already seen and append them to the window.
+
+        Any (host, chart) that could not be fetched is listed in `self.missing` until the next poll.
+
+        ##### Returns:
+        - **df** `pd.DataFrame` The new (processed) rows that were appended to the window.
+
+        """
+        results = trio.run(self._fetch)
+        for host_chart, data in results.items():
+            if not data:
+                continue
+            df = data[0]
+            if not self.host_prefix:
+                df = df.reset_index(level=0, drop=True)
+            last_seen = self.last_seen.get(host_chart)
+            if last_seen is not None:
+                df = df[df.index > last_seen]
+            if len(df):
+                self.last_seen[host_chart] = int(df.index.max())
+                pending = self._pending.get(host_chart)
+                self._pending[host_chart] = df if pending is None else pd.concat([pending, df])
+        df = self._ready()
+        if df is None or len(df) == 0:
+            return pd.DataFrame(columns=self.buffer.columns, index=pd.Index([], name='time_idx'), dtype=self.float_size)
+        self._last_time = int(df.index.max())
+        df = self._process(df.sort_index())
+        df = df.reindex(sorted(df.columns), axis=1).astype(self.float_size)
+        df.index.name = 'time_idx'
+        if self.stats is not None:
+            # rows about to be pushed out of the window leave the statistics first
+            n_evicted = min(len(self.buffer), len(self.buffer) + len(df) - self.buffer.capacity)
+            if n_evicted > 0:
+                self.stats.remove(self.buffer.view()[1][:n_evicted], self.buffer.columns)
+            self.stats.update(df.values[-self.buffer.capacity:], df.columns)
+        self.buffer.append(df.index.values, df.values, columns=list(df.columns))
+        return df
+
+    def to_frame(self, n: int = None, copy: bool = False) -> pd.DataFrame:
+        """The latest `n` rows (all if None) of the window as a dataframe.
+
+        Unless `copy` is True the dataframe is a view onto the underlying `RingBuffer`.
+        """
+        return self.buffer.to_frame(n, copy=copy)
+
@@ -1,9 +1,10 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: 01_wrangle.ipynb (unless otherwise specified).
 
-__all__ = ['drop_low_uniqueness_cols', 'drop_low_std_cols']
+__all__ = ['drop_low_uniqueness_cols', 'drop_low_std_cols', 'ColumnStats']
 
 # Cell
 #export
+import numpy as np
 import pandas as pd
 
 # Cell
@@ -43,4 +44,129 @@ def drop_low_std_cols(df: pd.DataFrame, std_thold=0.05) -> pd.DataFrame:
     """
 
     df = df.loc[:, df.std() > std_thold]
-    return df
\ No newline at end of file
+    return df
+
+# Cell
+
+
+class ColumnStats:
+    """Single pass count, mean, standard deviation and number of unique values of each column.
+
+    ##### Parameters:
+    - **max_unique** `int` Max number of unique values to count per column, beyond that a column is only known to have at least this many.
+
+    """
+
+    def __init__(self, max_unique: int = 10000):
+        self.max_unique = max_unique
+        self.columns = []
+        self._col_idx = {}
+        self._rows = np.zeros(0)
+        self._n = np.zeros(0)
+        self._mean = np.zeros(0)
+        self._m2 = np.zeros(0)
+        self._counts = []
+
+    def _idx(self, columns: list) -> np.ndarray:
+        new = [col for col in dict.fromkeys(columns) if col not in self._col_idx]
+        if new:
+            self._col_idx.update({col: len(self.columns) + i for i, col in enumerate(new)})
+            self.columns = self.columns + new
+            pad = np.zeros(len(new))
+            self._rows, self._n, self._mean, self._m2 = [
+                np.concatenate([a, pad]) for a in (self._rows, self._n, self._mean, self._m2)
+            ]
+            self._counts += [{} for _ in new]
+        return np.array([self._col_idx[col] for col in columns], dtype='int64')
+
+    @staticmethod
+    def _moments(values: np.ndarray) -> tuple:
+        n = (~np.isnan(values)).sum(axis=0)
+        mean = np.divide(np.nansum(values, axis=0), n, out=np.zeros(values.shape[1]), where=n > 0)
+        m2 = np.nansum((values - mean) ** 2, axis=0)
+        return n, mean, m2
+
+    def _count_unique(self, values: np.ndarray, idx: np.ndarray, sign: int):
+        for j, i in enumerate(idx):
+            counts = self._counts[i]
+            if counts is None:
+                continue
+            col = values[:, j]
+            for value, n in zip(*[a.tolist() for a in np.unique(col[~np.isnan(col)], return_counts=True)]):
+                n = counts.get(value, 0) + sign * n
+                if n > 0:
+                    counts[value] = n
+                else:
+                    counts.pop(value, None)
+            if len(counts) > self.max_unique:
+                self._counts[i] = None
+
+    def update(self, values, columns: list):
+        """Add a 2d (rows, columns) block of `values` for `columns` to the statistics."""
+        values = np.asarray(values, dtype='float64').reshape(-1, len(columns))
+        idx = self._idx(columns)
+        n_b, mean_b, m2_b = self._moments(values)
+        n_a, mean_a = self._n[idx], self._mean[idx]
+        n = n_a + n_b
+        delta = mean_b - mean_a
+        w = np.divide(n_b, n, out=np.zeros(len(idx)), where=n > 0)
+        self._mean[idx] = mean_a + delta * w
+        self._m2[idx] = self._m2[idx] + m2_b + delta ** 2 * n_a * w
+        self._n[idx] = n
+        self._rows[idx] += len(values)
+        self._count_unique(values, idx, 1)
+
+    def remove(self, values, columns: list):
+        """Remove a 2d (rows, columns) block of `values` previously added for `columns`, eg rows leaving a rolling window."""
+        values = np.asarray(values, dtype='float64').reshape(-1, len(columns))
+        idx = self._idx(columns)
+        n_b, mean_b, m2_b = self._moments(values)
+        n, mean = self._n[idx], self._mean[idx]
+        n_a = n - n_b
+        mean_a = np.divide(n * mean - n_b * mean_b, n_a, out=np.zeros(len(idx)), where=n_a > 0)
+        delta = mean_b - mean_a
+        w = np.divide(n_b, n, out=np.zeros(len(idx)), where=n > 0)
+        self._m2[idx] = np.where(n_a > 0, np.maximum(self._m2[idx] - m2_b - delta ** 2 * n_a * w, 0), 0)
+        self._mean[idx] = mean_a
+        self._n[idx] = n_a
+        self._rows[idx] = np.maximum(self._rows[idx] - len(values), 0)
+        self._count_unique(values, idx, -1)
+
+    @property
+    def count(self) -> pd.Series:
+        """Number of non null values of each column."""
+        return pd.Series(self._n, index=self.columns)
+
+    @property
+    def mean(self) -> pd.Series:
+        """Mean of each column."""
+        return pd.Series(np.where(self._n > 0, self._mean, np.nan), index=self.columns)
+
+    @property
+    def std(self) -> pd.Series:
+        """Sample standard deviation of each column, as `df.std()`."""
+        var = np.divide(self._m2, self._n - 1, out=np.full(len(self.columns), np.nan), where=self._n > 1)
+        return pd.Series(np.sqrt(var), index=self.columns)
+
+    @property
+    def nunique(self) -> pd.Series:
+        """Number of unique non null values of each column, capped at `max_unique`."""
+        return pd.Series([self.max_unique if c is None else len(c) for c in self._counts], index=self.columns, dtype='int64')
+
+    def keep(self, nunique_thold=None, std_thold: float = None) -> list:
+        """The columns `drop_low_uniqueness_cols` and `drop_low_std_cols` would keep.
+
+        Columns with more than `max_unique` unique values always pass `nunique_thold`.
+        """
+        keep = np.ones(len(self.columns), dtype=bool)
+        if nunique_thold:
+            nunique = self.nunique.values
+            saturated = np.array([c is None for c in self._counts], dtype=bool)
+            if isinstance(nunique_thold, int):
+                keep &= saturated | (nunique > nunique_thold)
+            elif isinstance(nunique_thold, float) and nunique_thold < 1.0:
+                keep &= saturated | (nunique / np.maximum(self._rows, 1) > nunique_thold)
+        if std_thold:
+            keep &= (self.std > std_thold).values
+        return [col for col, k in zip(self.columns, keep) if k]
+